@@ -1,85 +1,88 @@
-import matplotlib
-matplotlib.use('Qt5Agg')  # можно заменить на 'TkAgg' при необходимости
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-import numpy as np
-import random
+from algorithms import SortAlgorithms, check_size, get_algorithm
+from events import advance
+from bars import make_bars, set_bar_heights
+from pacing import FramePacer, estimate_changes
+from gui import pyplot, show
+from distributions import make_input, value_limits
+from tracecache import cached_events
+from palette import Highlights, ValuePalette
+from profiler import make_profiler
 
-class QuickSortVisualizer:
-    def __init__(self, n=500, update_every=5):
+class QuickSortVisualizer(SortAlgorithms):
+    def __init__(self, n=500, update_every=None, fps=60, duration=10.0, variant="quicksort",
+                 distribution="random", seed=0):
+        # variant - вариант из реестра: quicksort_median3, quicksort_3way и т.д.
+        check_size(variant, n)
+        super().__init__(variant)
+        self.title = get_algorithm(variant).title
         self.n = n
-        self.update_every = update_every  # обновлять граф каждые N шагов
-        self.arr = list(range(1, n + 1))
-        random.shuffle(self.arr)
-        self.colors = plt.cm.viridis(np.linspace(0, 1, self.n))
-        self.generator = self.quicksort_gen(self.arr.copy())
+        self.update_every = update_every  # обновлять граф каждые N изменений массива; None - автоматически
+        self.pacer = FramePacer(estimate_changes(variant, n), fps=fps, duration=duration)
+        self.arr = make_input(distribution, n, seed)  # sorted/reversed показывают вырождение опорного
+        self.limits = value_limits(self.arr)
+        plt = pyplot()
+        # Цвет - по значению элемента; опорные, сравнения и обмены кадра подсвечены
+        self.palette = ValuePalette(self.arr)
+        self.highlights = Highlights()
+        self.generator = cached_events(self, self.arr, seed, distribution)  # seed=None - без кэша
         self.current_frame = self.arr.copy()
         self.iteration = 0
         self.completed = False
-        self.final_message = ""
+        self.profiler = make_profiler(variant)  # VISUALSORT_PROFILE
 
         self.fig, self.ax = plt.subplots(figsize=(12, 6))
         self.bar_container = None
 
-    def quicksort_gen(self, arr):
-        stack = [(0, len(arr) - 1)]
-        iterations = 0
-        while stack:
-            l, r = stack.pop()
-            if l >= r:
-                continue
-            pivot = arr[l]
-            j = l
-            for i in range(l + 1, r + 1):
-                if arr[i] <= pivot:
-                    j += 1
-                    arr[j], arr[i] = arr[i], arr[j]
-                    iterations += 1
-                    if iterations % self.update_every == 0:
-                        yield arr.copy()
-            arr[l], arr[j] = arr[j], arr[l]
-            iterations += 1
-            yield arr.copy()
-            stack.append((j + 1, r))
-            stack.append((l, j - 1))
-        self.final_message = f"Готово! Итераций: {iterations}"
-
     def init_animation(self):
-        self.ax.set_title("QuickSort > Быстрая сортировка")
-        self.ax.set_ylim(0, self.n + 1)
+        self.ax.set_title(f"QuickSort > {self.title}")
+        self.ax.set_ylim(*self.limits)
         self.ax.set_xlim(-1, self.n)
         self.ax.set_xticks([])
         self.ax.set_yticks([])
-        bars = self.ax.bar(range(self.n), self.current_frame, color=self.colors, width=1.0)
+        bars = make_bars(self.ax, self.current_frame, self.palette.colors(self.current_frame), width=1.0)
         self.bar_container = bars
         return bars
 
     def update_animation(self, _):
         if not self.completed:
-            try:
-                self.current_frame = next(self.generator)
-                self.iteration += 1
-                for bar, height in zip(self.bar_container, self.current_frame):
-                    bar.set_height(height)
-                self.ax.set_title(f"QuickSort > Итерация: {self.iteration}")
-            except StopIteration:
-                self.completed = True
-                self.ax.set_title(f"QuickSort > {self.final_message}")
+            with self.profiler.span("frame"):
+                batch = self.update_every or self.pacer.next_batch()
+                dirty = set()
+                with self.profiler.span("generate"):
+                    changes = advance(self.generator, self.current_frame, batch, dirty, highlights=self.highlights)
+                if changes:
+                    self.pacer.done(changes)
+                    self.iteration += 1
+                    with self.profiler.span("bars"):
+                        set_bar_heights(self.bar_container, dirty, self.current_frame)
+                    with self.profiler.span("colors"):
+                        colors = self.highlights.overlay(self.palette.colors(self.current_frame))
+                        self.bar_container.set_facecolor(colors)
+                    self.ax.set_title(f"QuickSort > Итерация: {self.iteration}")
+                else:
+                    self.completed = True
+                    self.bar_container.set_facecolor(self.palette.colors(self.current_frame))
+                    self.ax.set_title(f"QuickSort > {self.final_message}")
         return self.bar_container
 
     def visualize(self):
+        from matplotlib.animation import FuncAnimation
+        plt = pyplot()
         self.anim = FuncAnimation(
             self.fig,
             self.update_animation,
             init_func=self.init_animation,
-            interval=1,  # можно увеличить до 10–20 для меньшей нагрузки
+            interval=self.pacer.interval,
             blit=False,
             cache_frame_data=False,
             repeat=False
         )
+        self.profiler.instrument_canvas(self.fig.canvas)
         plt.tight_layout()
-        plt.show()
+        with self.profiler.span("visualize"):
+            show()
+        self.profiler.dump()
 
 if __name__ == "__main__":
-    visualizer = QuickSortVisualizer(n=500, update_every=50)  # меньше update_every — плавнее, но тяжелее
+    visualizer = QuickSortVisualizer(n=500, fps=60, duration=10)  # шаг на кадр подбирается автоматически
     visualizer.visualize()
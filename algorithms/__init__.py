@@ -0,0 +1,115 @@
+# Реестр алгоритмов сортировки. Каждый алгоритм живёт в своём модуле пакета
+# и импортируется только при выборе, поэтому импорт реестра не тянет за собой
+# весь набор. 2D, 3D, гонка и экспорт берут генераторы отсюда.
+#
+# Генератор алгоритма: func(arr, run, **options) - сортирует arr на месте,
+# выдаёт события из events.py и в конце пишет итог в run.final_message.
+# Варианты одного алгоритма регистрируются под своими именами с разными options.
+import functools
+import importlib
+import math
+
+
+class AlgorithmSpec:
+    def __init__(self, name, module, function, title, complexity, max_size, estimate, options):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.options = options
+        self.title = title
+        self.complexity = complexity
+        self.max_size = max_size  # рекомендуемый предел n для интерактивного показа
+        self.estimate = estimate  # ожидаемое число изменений массива на случайном входе
+        self.func = None
+
+    def load(self):
+        if self.func is None:
+            self.func = getattr(importlib.import_module(self.module), self.function)
+            if self.options:
+                self.func = functools.partial(self.func, **self.options)
+        return self.func
+
+
+REGISTRY = {}
+
+
+def register(name, title, complexity, max_size, estimate, module=None, function=None, **options):
+    REGISTRY[name] = AlgorithmSpec(name, module or f"{__name__}.{name}", function or f"{name}_gen",
+                                   title, complexity, max_size, estimate, options)
+
+
+def register_variant(base, name, title, complexity=None, max_size=None, estimate=None, **options):
+    # Вариант существующего алгоритма: тот же модуль и функция, свои options
+    spec = get_algorithm(base)
+    register(name, title, complexity or spec.complexity, max_size or spec.max_size,
+             estimate or spec.estimate, spec.module, spec.function, **dict(spec.options, **options))
+
+
+def get_algorithm(name):
+    try:
+        return REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Неизвестный алгоритм: {name}")
+
+
+def algorithm_names():
+    return list(REGISTRY)
+
+
+def check_size(name, n):
+    spec = get_algorithm(name)
+    if n > spec.max_size:
+        raise ValueError(f"{name} ({spec.complexity}) не рекомендуется для n > {spec.max_size}: "
+                         f"сортировка займёт слишком много времени")
+
+
+register("quicksort", "Быстрая", "O(n log n)", 1_000_000,
+         lambda n: 0.45 * n * math.log2(n) + n)
+register_variant("quicksort", "quicksort_random", "Быстрая, случайный опорный", pivot="random")
+register_variant("quicksort", "quicksort_median3", "Быстрая, медиана трёх", pivot="median3")
+register_variant("quicksort", "quicksort_ninther", "Быстрая, медиана девяти", pivot="ninther")
+register_variant("quicksort", "quicksort_3way", "Быстрая, трёхчастное разбиение",
+                 pivot="median3", partition="3way")
+register_variant("quicksort", "quicksort_cutoff", "Быстрая, медиана трёх + вставки",
+                 pivot="median3", cutoff=16)
+register("bubblesort", "Пузырьковая", "O(n²)", 5_000,
+         lambda n: n * n / 4)
+register("mergesort", "Слиянием", "O(n log n)", 1_000_000,
+         lambda n: n * math.ceil(math.log2(n)))
+register("insertionsort", "Вставками", "O(n²)", 5_000,
+         lambda n: n * n / 4 + n)
+register("selectionsort", "Выбором", "O(n²)", 10_000,
+         lambda n: n)
+register("shellsort", "Шелла", "O(n^1.5)", 200_000,
+         lambda n: n * math.log2(n) + n ** 1.25)
+register_variant("shellsort", "shellsort_ciura", "Шелла, промежутки Циуры", "O(n^1.3)", 1_000_000,
+                 lambda n: 1.5 * n * math.log2(n), gaps="ciura")
+register_variant("shellsort", "shellsort_tokuda", "Шелла, промежутки Токуды", "O(n^1.3)", 1_000_000,
+                 lambda n: 1.5 * n * math.log2(n), gaps="tokuda")
+register("heapsort", "Пирамидальная", "O(n log n)", 1_000_000,
+         lambda n: n * math.log2(n))
+register("introsort", "Интроспективная", "O(n log n)", 1_000_000,
+         lambda n: 0.45 * n * math.log2(n) + n)
+register("timsort", "TimSort", "O(n log n)", 1_000_000,
+         lambda n: n * math.log2(n) + n)
+register("radixsort_lsd", "Поразрядная LSD", "O(n·k)", 1_000_000,
+         lambda n: n * math.ceil(math.log10(n + 1)),
+         module=f"{__name__}.radixsort", function="radixsort_lsd_gen")
+register("radixsort_msd", "Поразрядная MSD", "O(n·k)", 1_000_000,
+         lambda n: n * math.ceil(math.log10(n + 1)),
+         module=f"{__name__}.radixsort", function="radixsort_msd_gen")
+register("mergesort_parallel", "Слиянием, параллельная", "O(n log n / p)", 1_000_000,
+         lambda n: n * math.ceil(math.log2(n)),
+         module=f"{__name__}.parallel", function="parallel_mergesort_gen")
+register("quicksort_parallel", "Быстрая, параллельная", "O(n log n / p)", 1_000_000,
+         lambda n: 0.45 * n * math.log2(n) + n,
+         module=f"{__name__}.parallel", function="parallel_quicksort_gen")
+
+
+class SortAlgorithms:
+    def __init__(self, algorithm_name):
+        self.algorithm_name = algorithm_name
+        self.final_message = ""
+
+    def get_generator(self, arr):
+        return get_algorithm(self.algorithm_name).load()(arr, self)
@@ -0,0 +1,19 @@
+# Сортировка пузырьком с ранним выходом, если за проход не было обменов.
+from events import SWAP, COMPARE
+
+
+def bubblesort_gen(arr, run):
+    iterations = 0
+    n = len(arr)
+    for i in range(n):
+        swapped = False
+        for j in range(n - i - 1):
+            yield (COMPARE, j, j + 1)
+            if arr[j] > arr[j + 1]:
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                swapped = True
+                iterations += 1
+                yield (SWAP, j, j + 1)
+        if not swapped:
+            break
+    run.final_message = f"Готово! Итераций: {iterations}"
@@ -0,0 +1,43 @@
+# Пирамидальная сортировка: max-куча на месте, O(n log n) в худшем случае.
+from events import SWAP, COMPARE, AUX
+
+
+def sift_down(arr, lo, root, end):
+    # Просеивание в куче arr[lo:end], root - номер узла от lo; возвращает число обменов
+    swaps = 0
+    size = end - lo
+    while True:
+        child = 2 * root + 1
+        if child >= size:
+            return swaps
+        if child + 1 < size:
+            yield (COMPARE, lo + child, lo + child + 1)
+            if arr[lo + child] < arr[lo + child + 1]:
+                child += 1
+        yield (COMPARE, lo + root, lo + child)
+        if arr[lo + root] >= arr[lo + child]:
+            return swaps
+        arr[lo + root], arr[lo + child] = arr[lo + child], arr[lo + root]
+        swaps += 1
+        yield (SWAP, lo + root, lo + child)
+        root = child
+
+
+def heap_range(arr, l, r):
+    # Сортирует arr[l..r]; используется и интроспективной сортировкой
+    swaps = 0
+    n = r - l + 1
+    for root in range(n // 2 - 1, -1, -1):
+        swaps += yield from sift_down(arr, l, root, l + n)
+    for end in range(n - 1, 0, -1):
+        arr[l], arr[l + end] = arr[l + end], arr[l]
+        swaps += 1
+        yield (SWAP, l, l + end)
+        swaps += yield from sift_down(arr, l, 0, l + end)
+    return swaps
+
+
+def heapsort_gen(arr, run):
+    yield (AUX, 1, 0)
+    iterations = yield from heap_range(arr, 0, len(arr) - 1)
+    run.final_message = f"Готово! Итераций: {iterations}"
@@ -0,0 +1,22 @@
+# Сортировка вставками.
+from events import WRITE, COMPARE, AUX
+
+
+def insertionsort_gen(arr, run):
+    iterations = 0
+    yield (AUX, 1, 0)
+    for i in range(1, len(arr)):
+        key = arr[i]
+        j = i - 1
+        while j >= 0:
+            yield (COMPARE, j, j + 1)
+            if arr[j] <= key:
+                break
+            arr[j + 1] = arr[j]
+            iterations += 1
+            yield (WRITE, j + 1, arr[j])
+            j -= 1
+        arr[j + 1] = key
+        iterations += 1
+        yield (WRITE, j + 1, key)
+    run.final_message = f"Готово! Итераций: {iterations}"
@@ -0,0 +1,42 @@
+# Интроспективная сортировка: быстрая с медианой трёх, при превышении
+# глубины 2*log2(n) диапазон досортировывается пирамидальной, короткие
+# диапазоны - вставками. O(n log n) в худшем случае.
+import math
+
+from events import SWAP, PIVOT, AUX
+from algorithms.heapsort import heap_range
+from algorithms.quicksort import insertion_range, lomuto, median_of_three
+
+
+def introsort_gen(arr, run, cutoff=16):
+    n = len(arr)
+    max_depth = 2 * int(math.log2(n)) if n > 1 else 0
+    stack = [(0, n - 1, max_depth)]
+    iterations = 0
+    while stack:
+        l, r, depth = stack.pop()
+        if l >= r:
+            continue
+        if r - l < cutoff:
+            iterations += yield from insertion_range(arr, l, r)
+            continue
+        if depth == 0:
+            iterations += yield from heap_range(arr, l, r)
+            continue
+        p = yield from median_of_three(arr, l, (l + r) // 2, r)
+        if p != l:
+            arr[l], arr[p] = arr[p], arr[l]
+            iterations += 1
+            yield (SWAP, l, p)
+        yield (PIVOT, l, 0)
+        j, swaps = yield from lomuto(arr, l, r)
+        iterations += swaps
+        left, right = (l, j - 1, depth - 1), (j + 1, r, depth - 1)
+        if j - l < r - j:
+            stack.append(right)
+            stack.append(left)
+        else:
+            stack.append(left)
+            stack.append(right)
+        yield (AUX, 3 * len(stack), 0)
+    run.final_message = f"Готово! Итераций: {iterations}"
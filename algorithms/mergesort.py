@@ -0,0 +1,40 @@
+# Сортировка слиянием снизу вверх с буфером на n элементов.
+from events import WRITE, COMPARE, AUX
+
+
+def mergesort_gen(arr, run):
+    current_size = 1
+    n = len(arr)
+    temp = arr.copy()
+    iterations = 0
+    yield (AUX, n, 0)
+
+    while current_size < n:
+        for left in range(0, n, 2 * current_size):
+            mid = min(left + current_size - 1, n - 1)
+            right = min(left + 2 * current_size - 1, n - 1)
+            i, j, k = left, mid + 1, left
+            while i <= mid and j <= right:
+                yield (COMPARE, i, j)
+                if arr[i] <= arr[j]:
+                    temp[k] = arr[i]
+                    i += 1
+                else:
+                    temp[k] = arr[j]
+                    j += 1
+                k += 1
+                iterations += 1
+            while i <= mid:
+                temp[k] = arr[i]
+                i += 1
+                k += 1
+            while j <= right:
+                temp[k] = arr[j]
+                j += 1
+                k += 1
+            for x in range(left, right + 1):
+                arr[x] = temp[x]
+                iterations += 1
+                yield (WRITE, x, arr[x])
+        current_size *= 2
+    run.final_message = f"Готово! Итераций: {iterations}"
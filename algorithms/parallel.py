@@ -0,0 +1,237 @@
+# Параллельные сортировка слиянием и быстрая сортировка в пуле процессов.
+# Части массива сортируются в воркерах последовательными генераторами из
+# реестра; воркер возвращает отсортированную часть и свои события массивом
+# NumPy (tracefile.EVENT_DTYPE) с уже глобальными индексами. Генератор выдаёт
+# события всех воркеров фазы вперемешку - по доле выполненной каждым работы,
+# так что на экране части сортируются одновременно.
+#
+# Слияние: на каждом проходе пары соседних серий сливаются, и выход каждой
+# пары делится между воркерами по merge path - бинарным поиском точки на
+# диагонали, поэтому у каждого воркера ровно свой отрезок выхода и никакой
+# синхронизации. Быстрая сортировка разбивает массив в родителе, пока частей
+# меньше, чем воркеров, затем части сортируются в пуле интроспективной
+# сортировкой (быстрая с переходом на пирамидальную - не вырождается).
+#
+# События LANE отмечают, какой воркер владеет какими позициями. В итоге
+# run.final_message и run.parallel - ускорение параллельных фаз: суммарное
+# процессорное время воркеров к реальному времени фаз (на одном ядре - не больше 1).
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from events import SWAP, WRITE, COMPARE, PIVOT, AUX, LANE
+from tracefile import EVENT_DTYPE
+from algorithms.quicksort import lomuto, median_of_three
+
+# Меньше элементов на воркера - части не делятся дальше
+MIN_CHUNK = 16
+# Сколько держит воркер задача прогрева: пока он занят, следующая задача
+# достаётся другому воркеру, и запускаются все процессы пула
+WARM_UP_DELAY = 0.05
+# Последовательные сортировки частей в воркерах
+CHUNK_ALGORITHMS = ("mergesort", "introsort")
+
+
+class ChunkRun:
+    final_message = ""
+
+
+def to_records(events, offset):
+    # События части -> структурный массив с глобальными индексами; AUX частей не нужны
+    records = np.array([e for e in events if e[0] != AUX], dtype=EVENT_DTYPE)
+    if len(records):
+        records["a"] += offset
+        pairs = (records["op"] == SWAP) | (records["op"] == COMPARE)
+        records["b"][pairs] += offset
+    return records
+
+
+def warm_up(delay):
+    # Воркер: реестр и сортировки частей загружаются до первой фазы, чтобы импорт не попал в её время
+    from algorithms import get_algorithm
+    for algorithm_name in CHUNK_ALGORITHMS:
+        get_algorithm(algorithm_name).load()
+    time.sleep(delay)
+    return os.getpid()
+
+
+def sort_chunk(algorithm_name, values, offset):
+    # Воркер: сортирует values алгоритмом из реестра
+    from algorithms import get_algorithm
+    started = time.process_time()
+    events = list(get_algorithm(algorithm_name).load()(values, ChunkRun()))
+    return to_records(events, offset), values, time.process_time() - started
+
+
+def merge_segment(a, b, a_offset, b_offset, out_offset):
+    # Воркер: слияние отрезков a и b в свой отрезок выхода
+    started = time.process_time()
+    events = []
+    out = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        events.append((COMPARE, a_offset + i, b_offset + j))
+        if a[i] <= b[j]:
+            out.append(a[i])
+            i += 1
+        else:
+            out.append(b[j])
+            j += 1
+    out.extend(a[i:])
+    out.extend(b[j:])
+    events.extend((WRITE, out_offset + k, value) for k, value in enumerate(out))
+    return to_records(events, 0), out, time.process_time() - started
+
+
+def merge_path(a, b, d):
+    # Сколько элементов a и b среди первых d элементов слияния (равные - сначала из a)
+    lo, hi = max(0, d - len(b)), min(d, len(a))
+    while lo < hi:
+        i = (lo + hi) // 2
+        if a[i] <= b[d - i - 1]:
+            lo = i + 1
+        else:
+            hi = i
+    return lo, d - lo
+
+
+class Pool:
+    # Пул процессов с учётом времени: wall - реальное время фаз, busy - процессорное время воркеров,
+    # startup - запуск и прогрев процессов, в wall и ускорение не входит
+    def __init__(self, workers):
+        self.workers = workers
+        self.wall = 0.0
+        self.busy = 0.0
+        self.startup = 0.0
+        self.executor = None
+        # Демон-процесс (воркер гонки с parallel=True) не может порождать процессы
+        if workers > 1 and not multiprocessing.current_process().daemon:
+            started = time.perf_counter()
+            self.executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+            # Процессы spawn запускаются по мере задач - прогрев по задаче на воркера
+            list(self.executor.map(warm_up, [WARM_UP_DELAY] * workers))
+            self.startup = time.perf_counter() - started
+
+    def run(self, func, tasks):
+        started = time.perf_counter()
+        if self.executor is None:
+            results = [func(*task) for task in tasks]
+        else:
+            results = list(self.executor.map(func, *zip(*tasks)))
+        self.wall += time.perf_counter() - started
+        self.busy += sum(seconds for _, _, seconds in results)
+        return results
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def report(self, run, iterations):
+        speedup = self.busy / self.wall if self.wall else 1.0
+        run.parallel = {"workers": self.workers, "busy": self.busy, "wall": self.wall, "speedup": speedup,
+                        "startup": self.startup}
+        run.final_message = (f"Готово! Итераций: {iterations}, воркеров: {self.workers}, "
+                             f"ускорение ×{speedup:.1f} ({self.busy:.2f} с работы за {self.wall:.2f} с, "
+                             f"запуск пула {self.startup:.2f} с)")
+
+
+def resolve_workers(workers, n):
+    return max(1, min(workers or os.cpu_count() or 1, n // MIN_CHUNK))
+
+
+def lane_events(segments):
+    # segments - [(начало, конец, воркер)] по возрастанию; между отрезками - ничьи позиции
+    for lo, hi, worker in segments:
+        yield (LANE, lo, worker)
+        yield (LANE, hi, -1)
+
+
+def interleave(results):
+    # События воркеров одной фазы вперемешку, по доле выполненной работы;
+    # возвращает число изменений массива
+    parts = [records for records, _, _ in results if len(records)]
+    if not parts:
+        return 0
+    records = np.concatenate(parts)
+    progress = np.concatenate([(np.arange(len(part)) + 0.5) / len(part) for part in parts])
+    records = records[np.argsort(progress, kind="stable")]
+    for op, a, b in records.tolist():
+        yield (op, a, b if op == WRITE and not b.is_integer() else int(b))
+    return int(np.count_nonzero(records["op"] <= WRITE))
+
+
+def parallel_mergesort_gen(arr, run, workers=None):
+    n = len(arr)
+    workers = resolve_workers(workers, n)
+    yield (AUX, n, 0)
+    bounds = [n * k // workers for k in range(workers + 1)]
+    runs = [(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if hi > lo]
+    iterations = 0
+    pool = Pool(workers)
+    try:
+        results = pool.run(sort_chunk, [("mergesort", arr[lo:hi], lo) for lo, hi in runs])
+        yield from lane_events([(lo, hi, k) for k, (lo, hi) in enumerate(runs)])
+        iterations += yield from interleave(results)
+        for (lo, hi), (_, values, _) in zip(runs, results):
+            arr[lo:hi] = values
+        while len(runs) > 1:
+            tasks, segments = [], []
+            for (a_lo, a_hi), (b_lo, b_hi) in zip(runs[0::2], runs[1::2]):
+                a, b = arr[a_lo:a_hi], arr[b_lo:b_hi]
+                m = b_hi - a_lo
+                # Выход пары делится между воркерами пропорционально её длине
+                parts = max(1, min(m, round(workers * m / n)))
+                splits = [merge_path(a, b, m * k // parts) for k in range(parts + 1)]
+                for (i0, j0), (i1, j1) in zip(splits, splits[1:]):
+                    if i1 + j1 > i0 + j0:
+                        tasks.append((a[i0:i1], b[j0:j1], a_lo + i0, b_lo + j0, a_lo + i0 + j0))
+                        segments.append((a_lo + i0 + j0, a_lo + i1 + j1))
+            results = pool.run(merge_segment, tasks)
+            yield from lane_events([(lo, hi, k % workers) for k, (lo, hi) in enumerate(segments)])
+            iterations += yield from interleave(results)
+            for (lo, hi), (_, values, _) in zip(segments, results):
+                arr[lo:hi] = values
+            merged = [(a[0], b[1]) for a, b in zip(runs[0::2], runs[1::2])]
+            runs = merged + runs[len(merged) * 2:]
+        yield (LANE, 0, -1)
+    finally:
+        pool.close()
+    pool.report(run, iterations)
+
+
+def parallel_quicksort_gen(arr, run, workers=None):
+    n = len(arr)
+    workers = resolve_workers(workers, n)
+    iterations = 0
+    # Родитель делит самый длинный диапазон, пока их меньше, чем воркеров
+    ranges = [(0, n - 1)] if n > 1 else []
+    while ranges and len(ranges) < workers:
+        l, r = max(ranges, key=lambda lr: lr[1] - lr[0])
+        if r - l < 2 * MIN_CHUNK:
+            break
+        ranges.remove((l, r))
+        p = yield from median_of_three(arr, l, (l + r) // 2, r)
+        if p != l:
+            arr[l], arr[p] = arr[p], arr[l]
+            iterations += 1
+            yield (SWAP, l, p)
+        yield (PIVOT, l, 0)
+        j, swaps = yield from lomuto(arr, l, r)
+        iterations += swaps
+        ranges += [part for part in ((l, j - 1), (j + 1, r)) if part[1] > part[0]]
+        yield (AUX, 2 * len(ranges), 0)
+    ranges.sort()
+    pool = Pool(workers)
+    try:
+        results = pool.run(sort_chunk, [("introsort", arr[l:r + 1], l) for l, r in ranges])
+        yield from lane_events([(l, r + 1, k) for k, (l, r) in enumerate(ranges)])
+        iterations += yield from interleave(results)
+        for (l, r), (_, values, _) in zip(ranges, results):
+            arr[l:r + 1] = values
+        yield (LANE, 0, -1)
+    finally:
+        pool.close()
+    pool.report(run, iterations)
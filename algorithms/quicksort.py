@@ -0,0 +1,138 @@
+# Быстрая сортировка с выбором опорного элемента и схемы разбиения.
+# pivot: "first" - первый элемент диапазона, "random", "median3" - медиана
+# первого, среднего и последнего, "ninther" - медиана трёх медиан (Тьюки).
+# partition: "lomuto" - на две части, "3way" - голландский флаг (<, =, >),
+# не вырождается на входах с повторами. cutoff - диапазоны не длиннее
+# сортируются вставками. Меньшая часть обрабатывается первой, поэтому
+# стек не глубже log2(n).
+import random
+
+from events import SWAP, WRITE, COMPARE, PIVOT, AUX
+
+PIVOTS = ("first", "random", "median3", "ninther")
+PARTITIONS = ("lomuto", "3way")
+
+
+def median_of_three(arr, a, b, c):
+    # Индекс медианы arr[a], arr[b], arr[c]; сравнения выдаются событиями
+    yield (COMPARE, a, b)
+    if arr[a] > arr[b]:
+        a, b = b, a
+    yield (COMPARE, b, c)
+    if arr[b] <= arr[c]:
+        return b
+    yield (COMPARE, a, c)
+    return c if arr[a] <= arr[c] else a
+
+
+def choose_pivot(arr, l, r, pivot, rng):
+    # pivot уже проверен на входе quicksort_gen; короткий диапазон не делится
+    # на девятки, и ninther на нём берёт медиану трёх
+    if pivot == "first":
+        return l
+    if pivot == "random":
+        return rng.randint(l, r)
+    m = (l + r) // 2
+    if pivot == "median3" or r - l < 40:
+        return (yield from median_of_three(arr, l, m, r))
+    step = (r - l + 1) // 8
+    a = yield from median_of_three(arr, l, l + step, l + 2 * step)
+    b = yield from median_of_three(arr, m - step, m, m + step)
+    c = yield from median_of_three(arr, r - 2 * step, r - step, r)
+    return (yield from median_of_three(arr, a, b, c))
+
+
+def insertion_range(arr, l, r):
+    # Сортировка вставками arr[l..r]; возвращает число записей
+    writes = 0
+    for i in range(l + 1, r + 1):
+        key = arr[i]
+        j = i - 1
+        while j >= l:
+            yield (COMPARE, j, j + 1)
+            if arr[j] <= key:
+                break
+            arr[j + 1] = arr[j]
+            writes += 1
+            yield (WRITE, j + 1, arr[j])
+            j -= 1
+        if j + 1 != i:
+            arr[j + 1] = key
+            writes += 1
+            yield (WRITE, j + 1, key)
+    return writes
+
+
+def lomuto(arr, l, r):
+    # Разбиение arr[l..r] по опорному arr[l]; возвращает (позиция опорного, число обменов)
+    x = arr[l]
+    j = l
+    swaps = 0
+    for i in range(l + 1, r + 1):
+        yield (COMPARE, i, l)
+        if arr[i] <= x:
+            j += 1
+            arr[j], arr[i] = arr[i], arr[j]
+            swaps += 1
+            yield (SWAP, j, i)
+    arr[l], arr[j] = arr[j], arr[l]
+    yield (SWAP, l, j)
+    return j, swaps + 1
+
+
+def quicksort_gen(arr, run, pivot="first", partition="lomuto", cutoff=0, seed=0):
+    # seed фиксирован, чтобы прогон со случайным опорным воспроизводился
+    # в трассах, экспорте и параллельном режиме
+    if pivot not in PIVOTS:
+        raise ValueError(f"Неизвестная стратегия опорного элемента: {pivot}")
+    if partition not in PARTITIONS:
+        raise ValueError(f"Неизвестная схема разбиения: {partition}")
+    rng = random.Random(seed)
+    stack = [(0, len(arr) - 1)]
+    iterations = 0
+    while stack:
+        l, r = stack.pop()
+        if l >= r:
+            continue
+        if r - l < cutoff:
+            iterations += yield from insertion_range(arr, l, r)
+            continue
+        p = yield from choose_pivot(arr, l, r, pivot, rng)
+        if p != l:
+            arr[l], arr[p] = arr[p], arr[l]
+            iterations += 1
+            yield (SWAP, l, p)
+        yield (PIVOT, l, 0)
+        if partition == "3way":
+            # arr[l..lt-1] < x, arr[lt..i-1] == x, arr[gt+1..r] > x
+            x = arr[l]
+            lt, i, gt = l, l + 1, r
+            while i <= gt:
+                yield (COMPARE, i, lt)
+                if arr[i] < x:
+                    arr[lt], arr[i] = arr[i], arr[lt]
+                    iterations += 1
+                    yield (SWAP, lt, i)
+                    lt += 1
+                    i += 1
+                elif arr[i] > x:
+                    arr[i], arr[gt] = arr[gt], arr[i]
+                    iterations += 1
+                    yield (SWAP, i, gt)
+                    gt -= 1
+                else:
+                    i += 1
+            left, right = (l, lt - 1), (gt + 1, r)
+        else:
+            j, swaps = yield from lomuto(arr, l, r)
+            iterations += swaps
+            left, right = (l, j - 1), (j + 1, r)
+        # Большая часть кладётся первой - меньшая снимается со стека раньше
+        if left[1] - left[0] < right[1] - right[0]:
+            stack.append(right)
+            stack.append(left)
+        else:
+            stack.append(left)
+            stack.append(right)
+        yield (AUX, 2 * len(stack), 0)
+    run.final_message = f"Готово! Итераций: {iterations}"
@@ -0,0 +1,88 @@
+# Поразрядная сортировка целых чисел без сравнений.
+# LSD - от младшего разряда к старшему, устойчивый подсчёт на каждом проходе.
+# MSD - от старшего разряда, корзины обрабатываются независимо, короткие
+# досортировываются вставками. Оба варианта раскладывают элементы через
+# буфер на n элементов и записывают их обратно в массив.
+from events import WRITE, AUX
+from algorithms.quicksort import insertion_range
+
+
+def integer_keys(arr):
+    # Ключи от нуля: отрицательные и сдвинутые значения сдвигаются на минимум
+    for value in arr:
+        if value != int(value):
+            raise ValueError("Поразрядная сортировка работает только с целыми числами")
+    offset = int(min(arr))
+    return [int(value) - offset for value in arr]
+
+
+def radixsort_lsd_gen(arr, run, base=10):
+    n = len(arr)
+    iterations = 0
+    keys = integer_keys(arr) if n else []
+    top = max(keys) if n else 0
+    yield (AUX, 2 * n + base, 0)
+    exp = 1
+    while top // exp > 0:
+        counts = [0] * base
+        for key in keys:
+            counts[key // exp % base] += 1
+        total = 0
+        for d in range(base):
+            counts[d], total = total, total + counts[d]
+        order = [0] * n
+        for k, key in enumerate(keys):
+            d = key // exp % base
+            order[counts[d]] = k
+            counts[d] += 1
+        values = [arr[k] for k in order]
+        keys = [keys[k] for k in order]
+        for k in range(n):
+            if arr[k] != values[k]:
+                arr[k] = values[k]
+                iterations += 1
+                yield (WRITE, k, values[k])
+        exp *= base
+    run.final_message = f"Готово! Итераций: {iterations}"
+
+
+def radixsort_msd_gen(arr, run, base=10, cutoff=16):
+    n = len(arr)
+    iterations = 0
+    keys = integer_keys(arr) if n else []
+    top = max(keys) if n else 0
+    exp = 1
+    while top // exp >= base:
+        exp *= base
+    stack = [(0, n, exp)] if n > 1 else []
+    while stack:
+        lo, hi, exp = stack.pop()
+        if hi - lo <= cutoff:
+            iterations += yield from insertion_range(arr, lo, hi - 1)
+            continue
+        counts = [0] * base
+        for k in range(lo, hi):
+            counts[keys[k] // exp % base] += 1
+        starts = [0] * (base + 1)
+        for d in range(base):
+            starts[d + 1] = starts[d] + counts[d]
+        fill = starts[:base]
+        order = [0] * (hi - lo)
+        for k in range(lo, hi):
+            d = keys[k] // exp % base
+            order[fill[d]] = k
+            fill[d] += 1
+        values = [arr[k] for k in order]
+        bucket_keys = [keys[k] for k in order]
+        for k in range(hi - lo):
+            keys[lo + k] = bucket_keys[k]
+            if arr[lo + k] != values[k]:
+                arr[lo + k] = values[k]
+                iterations += 1
+                yield (WRITE, lo + k, values[k])
+        if exp > 1:
+            for d in range(base - 1, -1, -1):
+                if counts[d] > 1:
+                    stack.append((lo + starts[d], lo + starts[d + 1], exp // base))
+        yield (AUX, n + base * len(stack), 0)
+    run.final_message = f"Готово! Итераций: {iterations}"
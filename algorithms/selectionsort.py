@@ -0,0 +1,16 @@
+# Сортировка выбором.
+from events import SWAP, COMPARE
+
+
+def selectionsort_gen(arr, run):
+    iterations = 0
+    for i in range(len(arr)):
+        min_idx = i
+        for j in range(i + 1, len(arr)):
+            yield (COMPARE, j, min_idx)
+            if arr[j] < arr[min_idx]:
+                min_idx = j
+            iterations += 1
+        arr[i], arr[min_idx] = arr[min_idx], arr[i]
+        yield (SWAP, i, min_idx)
+    run.final_message = f"Готово! Итераций: {iterations}"
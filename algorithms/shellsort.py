@@ -0,0 +1,54 @@
+# Сортировка Шелла с выбором последовательности промежутков:
+# "shell" - n/2, n/4, ..., 1 (O(n²) в худшем случае), "ciura" - эмпирическая
+# последовательность Циуры, продолженная умножением на 2.25, "tokuda" -
+# ceil((9^k - 4^k) / (5 * 4^(k-1))).
+import math
+
+from events import WRITE, COMPARE, AUX
+
+CIURA = [1, 4, 10, 23, 57, 132, 301, 701, 1750]
+
+
+def gap_sequence(n, gaps):
+    # Промежутки меньше n в порядке убывания
+    if gaps == "shell":
+        seq = []
+        gap = n // 2
+        while gap > 0:
+            seq.append(gap)
+            gap //= 2
+        return seq
+    if gaps == "ciura":
+        seq = list(CIURA)
+        while seq[-1] < n:
+            seq.append(int(seq[-1] * 2.25))
+    elif gaps == "tokuda":
+        seq = []
+        k = 1
+        while not seq or seq[-1] < n:
+            seq.append(math.ceil((9 ** k - 4 ** k) / (5 * 4 ** (k - 1))))
+            k += 1
+    else:
+        raise ValueError(f"Неизвестная последовательность промежутков: {gaps}")
+    return [gap for gap in reversed(seq) if gap < n]
+
+
+def shellsort_gen(arr, run, gaps="shell"):
+    n = len(arr)
+    iterations = 0
+    yield (AUX, 1, 0)
+    for gap in gap_sequence(n, gaps):
+        for i in range(gap, n):
+            temp = arr[i]
+            j = i
+            while j >= gap:
+                yield (COMPARE, j - gap, j)
+                if arr[j - gap] <= temp:
+                    break
+                arr[j] = arr[j - gap]
+                iterations += 1
+                yield (WRITE, j, arr[j])
+                j -= gap
+            arr[j] = temp
+            yield (WRITE, j, temp)
+    run.final_message = f"Готово! Итераций: {iterations}"
@@ -0,0 +1,285 @@
+# TimSort: естественные серии, короткие серии добиваются вставками с двоичным
+# поиском до minrun, стек серий сливается по инвариантам Питерса, при слиянии
+# после MIN_GALLOP побед подряд одной серии включается режим галопа.
+# Буфер слияния - меньшая из двух серий.
+from events import SWAP, WRITE, COMPARE, AUX
+
+MIN_MERGE = 32
+MIN_GALLOP = 7
+
+
+def min_run_length(n):
+    r = 0
+    while n >= MIN_MERGE:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+
+class TimSort:
+    def __init__(self, arr):
+        self.arr = arr
+        self.runs = []  # (начало, длина)
+        self.min_gallop = MIN_GALLOP
+
+    def sort(self):
+        arr = self.arr
+        n = len(arr)
+        min_run = min_run_length(n)
+        lo = 0
+        while lo < n:
+            run_hi = yield from self.count_run(lo, n)
+            length = run_hi - lo
+            if length < min_run:
+                force = min(min_run, n - lo)
+                yield from self.binary_insertion(lo, lo + force, run_hi)
+                length = force
+            self.runs.append((lo, length))
+            yield from self.merge_collapse()
+            lo += length
+        while len(self.runs) > 1:
+            yield from self.merge_at(len(self.runs) - 2)
+
+    def count_run(self, lo, hi):
+        # Конец серии, начинающейся в lo; строго убывающая серия разворачивается
+        arr = self.arr
+        run_hi = lo + 1
+        if run_hi == hi:
+            return hi
+        yield (COMPARE, run_hi, lo)
+        descending = arr[run_hi] < arr[lo]
+        run_hi += 1
+        while run_hi < hi:
+            yield (COMPARE, run_hi, run_hi - 1)
+            if (arr[run_hi] < arr[run_hi - 1]) != descending:
+                break
+            run_hi += 1
+        if descending:
+            i, j = lo, run_hi - 1
+            while i < j:
+                arr[i], arr[j] = arr[j], arr[i]
+                yield (SWAP, i, j)
+                i += 1
+                j -= 1
+        return run_hi
+
+    def binary_insertion(self, lo, hi, start):
+        # arr[lo:start] уже отсортирован, остальные элементы вставляются по одному
+        arr = self.arr
+        for i in range(start, hi):
+            key = arr[i]
+            left, right = lo, i
+            while left < right:
+                mid = (left + right) // 2
+                yield (COMPARE, mid, i)
+                if key < arr[mid]:
+                    right = mid
+                else:
+                    left = mid + 1
+            for k in range(i, left, -1):
+                arr[k] = arr[k - 1]
+                yield (WRITE, k, arr[k])
+            if left != i:
+                arr[left] = key
+                yield (WRITE, left, key)
+
+    def merge_collapse(self):
+        runs = self.runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]
+                    or n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]):
+                if runs[n - 1][1] < runs[n + 1][1]:
+                    n -= 1
+            elif runs[n][1] > runs[n + 1][1]:
+                break
+            yield from self.merge_at(n)
+
+    def merge_at(self, i):
+        arr = self.arr
+        base_a, len_a = self.runs[i]
+        base_b, len_b = self.runs[i + 1]
+        self.runs[i] = (base_a, len_a + len_b)
+        del self.runs[i + 1]
+        # Начало A, которое меньше всего B, и хвост B, который больше всего A, уже на месте
+        k = yield from gallop(arr[base_b], arr, base_a, len_a, base_a, base_b, True, False)
+        base_a += k
+        len_a -= k
+        if len_a == 0:
+            return
+        len_b = yield from gallop(arr[base_a + len_a - 1], arr, base_b, len_b, base_b,
+                                  base_a + len_a - 1, False, True)
+        if len_b == 0:
+            return
+        yield (AUX, min(len_a, len_b), 0)
+        if len_a <= len_b:
+            yield from self.merge_lo(base_a, len_a, base_b, len_b)
+        else:
+            yield from self.merge_hi(base_a, len_a, base_b, len_b)
+        yield (AUX, 0, 0)
+
+    def merge_lo(self, base_a, len_a, base_b, len_b):
+        # A копируется в буфер, слияние идёт слева направо
+        arr = self.arr
+        tmp = arr[base_a:base_a + len_a]
+        i, j, end_b, dest = 0, base_b, base_b + len_b, base_a
+        while i < len_a and j < end_b:
+            count_a = count_b = 0
+            while i < len_a and j < end_b:
+                yield (COMPARE, j, dest)
+                if arr[j] < tmp[i]:
+                    arr[dest] = arr[j]
+                    j += 1
+                    count_b += 1
+                    count_a = 0
+                else:
+                    arr[dest] = tmp[i]
+                    i += 1
+                    count_a += 1
+                    count_b = 0
+                yield (WRITE, dest, arr[dest])
+                dest += 1
+                if count_a >= self.min_gallop or count_b >= self.min_gallop:
+                    break
+            # Галоп: серии длиной от MIN_GALLOP копируются целиком
+            while i < len_a and j < end_b:
+                k = yield from gallop(arr[j], tmp, i, len_a - i, dest, j, True, False)
+                for _ in range(k):
+                    arr[dest] = tmp[i]
+                    yield (WRITE, dest, tmp[i])
+                    i += 1
+                    dest += 1
+                if i >= len_a:
+                    break
+                arr[dest] = arr[j]
+                yield (WRITE, dest, arr[j])
+                dest += 1
+                j += 1
+                if j >= end_b:
+                    break
+                k2 = yield from gallop(tmp[i], arr, j, end_b - j, j, dest, False, False)
+                for _ in range(k2):
+                    arr[dest] = arr[j]
+                    yield (WRITE, dest, arr[j])
+                    j += 1
+                    dest += 1
+                if j >= end_b:
+                    break
+                arr[dest] = tmp[i]
+                yield (WRITE, dest, tmp[i])
+                dest += 1
+                i += 1
+                if k < MIN_GALLOP and k2 < MIN_GALLOP:
+                    self.min_gallop += 1
+                    break
+                self.min_gallop = max(1, self.min_gallop - 1)
+        # Остаток B уже на месте, дописывается остаток A
+        while i < len_a:
+            arr[dest] = tmp[i]
+            yield (WRITE, dest, tmp[i])
+            i += 1
+            dest += 1
+
+    def merge_hi(self, base_a, len_a, base_b, len_b):
+        # B копируется в буфер, слияние идёт справа налево
+        arr = self.arr
+        tmp = arr[base_b:base_b + len_b]
+        i, t, dest = base_a + len_a - 1, len_b - 1, base_b + len_b - 1
+        while i >= base_a and t >= 0:
+            count_a = count_b = 0
+            while i >= base_a and t >= 0:
+                yield (COMPARE, i, dest)
+                if tmp[t] < arr[i]:
+                    arr[dest] = arr[i]
+                    i -= 1
+                    count_a += 1
+                    count_b = 0
+                else:
+                    arr[dest] = tmp[t]
+                    t -= 1
+                    count_b += 1
+                    count_a = 0
+                yield (WRITE, dest, arr[dest])
+                dest -= 1
+                if count_a >= self.min_gallop or count_b >= self.min_gallop:
+                    break
+            while i >= base_a and t >= 0:
+                p = yield from gallop(tmp[t], arr, base_a, i - base_a + 1, base_a, dest, True, True)
+                k = i - base_a + 1 - p
+                for _ in range(k):
+                    arr[dest] = arr[i]
+                    yield (WRITE, dest, arr[i])
+                    i -= 1
+                    dest -= 1
+                if i < base_a:
+                    break
+                arr[dest] = tmp[t]
+                yield (WRITE, dest, tmp[t])
+                dest -= 1
+                t -= 1
+                if t < 0:
+                    break
+                p = yield from gallop(arr[i], tmp, 0, t + 1, dest - t, i, False, True)
+                k2 = t + 1 - p
+                for _ in range(k2):
+                    arr[dest] = tmp[t]
+                    yield (WRITE, dest, tmp[t])
+                    t -= 1
+                    dest -= 1
+                if t < 0:
+                    break
+                arr[dest] = arr[i]
+                yield (WRITE, dest, arr[i])
+                dest -= 1
+                i -= 1
+                if k < MIN_GALLOP and k2 < MIN_GALLOP:
+                    self.min_gallop += 1
+                    break
+                self.min_gallop = max(1, self.min_gallop - 1)
+        # Остаток A уже на месте, дописывается остаток B
+        while t >= 0:
+            arr[dest] = tmp[t]
+            yield (WRITE, dest, tmp[t])
+            t -= 1
+            dest -= 1
+
+
+def gallop(key, a, base, length, at, key_at, right, from_end):
+    # Позиция вставки key в отсортированный a[base:base+length]: перед равными
+    # (right=False) или после них (right=True). Экспоненциальный поиск от начала
+    # или от конца, затем двоичный. at и key_at - индексы массива для подсветки
+    # сравнений (элементы буфера показываются там, куда они будут записаны).
+    lo, hi = 0, length
+    offset = 0
+    while offset < length:
+        i = length - 1 - offset if from_end else offset
+        yield (COMPARE, at + i, key_at)
+        before = key < a[base + i] if right else key <= a[base + i]
+        if before != from_end:
+            if from_end:
+                lo = i + 1
+            else:
+                hi = i
+            break
+        if from_end:
+            hi = i
+        else:
+            lo = i + 1
+        offset = 2 * offset + 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        yield (COMPARE, at + mid, key_at)
+        if (key < a[base + mid]) if right else (key <= a[base + mid]):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def timsort_gen(arr, run):
+    iterations = 0
+    for event in TimSort(arr).sort():
+        if event[0] <= WRITE:
+            iterations += 1
+        yield event
+    run.final_message = f"Готово! Итераций: {iterations}"
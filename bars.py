@@ -0,0 +1,26 @@
+# Столбцы 2D-визуализации одной коллекцией PolyCollection.
+# Коллекция создаётся один раз; при обновлении меняются только вершины
+# затронутых столбцов, без пересоздания n объектов Rectangle.
+import numpy as np
+
+
+def make_bars(ax, heights, colors, width=0.8):
+    # matplotlib - только при построении окна: терминальный и безоконный режимы без него
+    from matplotlib.collections import PolyCollection
+    n = len(heights)
+    x = np.arange(n)
+    verts = np.zeros((n, 4, 2))
+    verts[:, 0, 0] = verts[:, 1, 0] = x - width / 2
+    verts[:, 2, 0] = verts[:, 3, 0] = x + width / 2
+    verts[:, 1, 1] = verts[:, 2, 1] = heights
+    bars = PolyCollection(verts, facecolors=colors, linewidths=0)
+    ax.add_collection(bars)
+    return bars
+
+
+def set_bar_heights(bars, indices, heights):
+    # heights - текущий буфер целиком, indices - изменившиеся позиции
+    paths = bars.get_paths()
+    for k in indices:
+        paths[k].vertices[1:3, 1] = heights[k]
+    bars.stale = True
@@ -0,0 +1,59 @@
+# Столбцы 3D-визуализации одной коллекцией Poly3DCollection.
+# Кубоиды строятся один раз из шаблона; при обновлении переписываются
+# только z-координаты верхних вершин изменившихся столбцов. Затенение
+# граней не зависит от высоты, поэтому цвета считаются один раз.
+from matplotlib.colors import LightSource, to_rgba_array
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+import numpy as np
+
+# Единичный кубоид [грань, вершина, координата], порядок граней как в Axes3D.bar3d
+CUBOID = np.array([
+    ((0, 0, 0), (0, 1, 0), (1, 1, 0), (1, 0, 0)),  # -z
+    ((0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)),  # +z
+    ((0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1)),  # -y
+    ((0, 1, 0), (0, 1, 1), (1, 1, 1), (1, 1, 0)),  # +y
+    ((0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 0)),  # -x
+    ((1, 0, 0), (1, 1, 0), (1, 1, 1), (1, 0, 1)),  # +x
+], dtype=float)
+NORMALS = np.array([(0, 0, -1), (0, 0, 1), (0, -1, 0), (0, 1, 0), (-1, 0, 0), (1, 0, 0)], dtype=float)
+# Вершины, высота которых равна значению столбца
+TOP = CUBOID[..., 2] == 1
+
+
+def shade_faces(colors, lightsource=None):
+    # То же затенение, что у bar3d(shade=True), но на шесть нормалей сразу
+    if lightsource is None:
+        lightsource = LightSource(azdeg=225, altdeg=19.4712)
+    shade = 0.3 + 0.7 * (NORMALS @ lightsource.direction + 1) / 2
+    rgba = to_rgba_array(colors)
+    faces = np.repeat(rgba[:, np.newaxis, :], 6, axis=1)
+    faces[..., :3] *= shade[np.newaxis, :, np.newaxis]
+    return faces.reshape(-1, 4)
+
+
+class Bars3D:
+    def __init__(self, ax, heights, colors, width=1.0, depth=1.0, alpha=None):
+        n = len(heights)
+        self.verts = np.empty((n,) + CUBOID.shape)
+        self.verts[..., 0] = np.arange(n)[:, None, None] + width * CUBOID[..., 0]
+        self.verts[..., 1] = depth * CUBOID[..., 1]
+        self.verts[..., 2] = 0
+        self.zs = self.verts[..., 2]
+        self.zs[:, TOP] = np.asarray(heights, dtype=float)[:, None]
+        self.faces = self.verts.reshape(-1, 4, 3)
+        self.collection = Poly3DCollection(self.faces, facecolors=shade_faces(colors), alpha=alpha)
+        ax.add_collection3d(self.collection)
+
+    def set_colors(self, colors):
+        self.collection.set_facecolor(shade_faces(colors))
+
+    def set_heights(self, indices, heights):
+        # heights - текущий буфер целиком, indices - изменившиеся позиции
+        if len(indices) == 0:
+            return
+        idx = np.fromiter(indices, dtype=np.intp, count=len(indices))
+        values = np.fromiter((heights[k] for k in idx), dtype=float, count=len(idx))
+        top = self.zs[idx]
+        top[:, TOP] = values[:, None]
+        self.zs[idx] = top
+        self.collection.set_verts(self.faces)
@@ -0,0 +1,205 @@
+# Пакетная сортировка: много независимых строк одновременно (например 256 x 256).
+# Все строки идут в ногу: шаг сортирующей сети - одна векторная операция NumPy
+# над всей матрицей, без цикла Python по массивам. Результат рисуется одной
+# картой высот (imshow) или поверхностью (Poly3DCollection, как у plot_surface),
+# данные которых обновляются на месте - наглядная пропускная способность data-parallel
+# сортировки без GPU.
+#
+#   python batch.py --rows 256 --columns 256 --algorithm bitonic --mode surface
+import argparse
+import time
+
+import numpy as np
+
+from distributions import DISTRIBUTIONS, make_array
+from gui import pyplot, show
+from profiler import make_profiler
+
+
+# ---------- Сортирующие сети ----------
+def odd_even_steps(grid):
+    # Чёт-нечётная перестановка: n фаз, в каждой - сравнение-обмен соседних пар
+    n = grid.shape[1]
+    for phase in range(n):
+        start = phase % 2
+        stop = n - (n - start) % 2
+        left, right = grid[:, start:stop:2], grid[:, start + 1:stop:2]
+        low = np.minimum(left, right)
+        right[...] = np.maximum(left, right)
+        left[...] = low
+        yield left.size
+
+
+def bitonic_steps(grid):
+    # Битоническая сеть Бэтчера: log n (log n + 1) / 2 шагов. Длина строки
+    # дополняется до степени двойки значением +inf, хвост после сортировки пуст
+    rows, n = grid.shape
+    size = 1 << max(0, (n - 1).bit_length())
+    work = grid if size == n else np.hstack([grid, np.full((rows, size - n), np.inf)])
+    k = 2
+    while k <= size:
+        j = k // 2
+        while j > 0:
+            # Позиции i и i + j - пара; блоки по k чередуют направление (i & k).
+            # reshape даёт представления пар без копий и без индексных массивов
+            pairs = work.reshape(rows, size // k, k // (2 * j), 2, j)
+            a, b = pairs[:, :, :, 0], pairs[:, :, :, 1]
+            low, high = np.minimum(a, b), np.maximum(a, b)
+            a[:, 0::2], b[:, 0::2] = low[:, 0::2], high[:, 0::2]
+            a[:, 1::2], b[:, 1::2] = high[:, 1::2], low[:, 1::2]
+            if work is not grid:
+                grid[...] = work[:, :n]
+            yield rows * size // 2
+            j //= 2
+        k *= 2
+
+
+BATCH_ALGORITHMS = {
+    "odd_even": (odd_even_steps, "Чёт-нечётная перестановка"),
+    "bitonic": (bitonic_steps, "Битоническая сеть"),
+}
+
+
+def make_grid(distribution, rows, columns, seed=None):
+    # Каждая строка - свой вход той же формы; seed даёт воспроизводимую матрицу
+    seeds = np.random.SeedSequence(seed).spawn(rows)
+    return np.array([make_array(distribution, columns, s) for s in seeds], dtype=float)
+
+
+# ---------- Визуализатор ----------
+class BatchVisualizer:
+    def __init__(self, rows=256, columns=256, algorithm="bitonic", distribution="random", seed=0,
+                 mode="image", steps_per_frame=1, interval=30, max_cells=64):
+        try:
+            steps, self.title = BATCH_ALGORITHMS[algorithm]
+        except KeyError:
+            raise ValueError(f"Неизвестная сортирующая сеть: {algorithm}")
+        if mode not in ("image", "surface"):
+            raise ValueError(f"Неизвестный режим: {mode}")
+        self.algorithm = algorithm
+        self.grid = make_grid(distribution, rows, columns, seed)
+        self.steps = steps(self.grid)
+        self.mode = mode
+        self.steps_per_frame = steps_per_frame  # шагов сети на кадр
+        self.interval = interval
+        # Поверхность из rows x columns граней рисуется медленно - берётся каждая stride-я точка
+        self.stride = max(1, -(-max(rows, columns) // max_cells))
+        self.step = 0
+        self.exchanges = 0
+        self.sort_time = 0.0
+        self.completed = False
+        self.low, self.high = float(self.grid.min()), float(self.grid.max())
+        self.profiler = make_profiler(f"batch {algorithm}")  # VISUALSORT_PROFILE
+
+    def advance(self):
+        # Следующие steps_per_frame шагов сети; False - все строки отсортированы
+        started = time.perf_counter()
+        for _ in range(self.steps_per_frame):
+            exchanges = next(self.steps, None)
+            if exchanges is None:
+                self.completed = True
+                break
+            self.step += 1
+            self.exchanges += exchanges
+        self.sort_time += time.perf_counter() - started
+        return not self.completed
+
+    def throughput(self):
+        rate = self.exchanges / self.sort_time if self.sort_time else 0.0
+        return f"шаг {self.step}, сравнений-обменов: {self.exchanges} ({rate / 1e6:.1f} млн/с)"
+
+    # ---------- Отрисовка ----------
+    def surface_verts(self):
+        z = self.grid[::self.stride, ::self.stride]
+        rows, columns = z.shape
+        y, x = np.mgrid[0:rows, 0:columns] * self.stride
+        corners = [(slice(None, -1), slice(None, -1)), (slice(None, -1), slice(1, None)),
+                   (slice(1, None), slice(1, None)), (slice(1, None), slice(None, -1))]
+        verts = np.stack([np.stack([x[c], y[c], z[c]], axis=-1) for c in corners], axis=2)
+        return verts.reshape(-1, 4, 3), verts[..., 2].mean(axis=2).ravel()
+
+    def init_figure(self):
+        plt = pyplot()
+        self.fig = plt.figure(figsize=(12, 8))
+        rows, columns = self.grid.shape
+        if self.mode == "image":
+            self.ax = self.fig.add_subplot(111)
+            self.artist = self.ax.imshow(self.grid, cmap="viridis", vmin=self.low, vmax=self.high,
+                                         aspect="auto", interpolation="nearest")
+            self.ax.set_xlabel("позиция в строке")
+            self.ax.set_ylabel("строка")
+        else:
+            from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+            self.ax = self.fig.add_subplot(111, projection="3d")
+            verts, heights = self.surface_verts()
+            self.artist = Poly3DCollection(verts, cmap="viridis", linewidths=0)
+            self.artist.set_array(heights)
+            self.artist.set_clim(self.low, self.high)
+            self.ax.add_collection3d(self.artist)
+            self.ax.set_xlim(0, columns)
+            self.ax.set_ylim(0, rows)
+            self.ax.set_zlim(self.low, self.high)
+        self.fig.suptitle(f"{self.title}: {rows} строк x {columns}")
+
+    def redraw(self):
+        if self.mode == "image":
+            self.artist.set_data(self.grid)
+        else:
+            verts, heights = self.surface_verts()
+            self.artist.set_verts(verts)
+            self.artist.set_array(heights)
+        self.ax.set_title(self.throughput())
+
+    def update_animation(self, _):
+        if not self.completed:
+            with self.profiler.span("frame"):
+                with self.profiler.span("generate"):
+                    active = self.advance()
+                if not active:
+                    self.anim.event_source.stop()
+                    print(f"{self.title}: {self.throughput()}")
+                with self.profiler.span("render"):
+                    self.redraw()
+        return [self.artist]
+
+    def visualize(self):
+        from matplotlib.animation import FuncAnimation
+        self.init_figure()
+        self.anim = FuncAnimation(self.fig, self.update_animation, interval=self.interval,
+                                  blit=False, cache_frame_data=False, repeat=False)
+        self.profiler.instrument_canvas(self.fig.canvas)
+        with self.profiler.span("visualize"):
+            show()
+        self.profiler.dump()
+
+    def run_headless(self):
+        # Только сортировка, без отрисовки: чистая пропускная способность сети
+        while self.advance():
+            pass
+        print(f"{self.title}: {self.throughput()}")
+
+
+# ---------- Консольный интерфейс ----------
+def main():
+    parser = argparse.ArgumentParser(description="Пакетная сортировка строк матрицы сортирующей сетью")
+    parser.add_argument("--rows", type=int, default=256)
+    parser.add_argument("--columns", type=int, default=256)
+    parser.add_argument("--algorithm", default="bitonic", choices=sorted(BATCH_ALGORITHMS))
+    parser.add_argument("--distribution", default="random", choices=list(DISTRIBUTIONS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", default="image", choices=["image", "surface"],
+                        help="карта высот (быстро) или 3D-поверхность")
+    parser.add_argument("--steps-per-frame", type=int, default=1)
+    parser.add_argument("--headless", action="store_true", help="без окна: только замер пропускной способности")
+    args = parser.parse_args()
+
+    visualizer = BatchVisualizer(args.rows, args.columns, args.algorithm, args.distribution, args.seed,
+                                 mode=args.mode, steps_per_frame=args.steps_per_frame)
+    if args.headless:
+        visualizer.run_headless()
+    else:
+        visualizer.visualize()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# Бенчмарки: стоимость алгоритмов, накладные расходы генераторов и пропускная
+# способность рендереров. Перебирает алгоритмы x размеры x распределения входа
+# и пишет результаты в JSON/CSV, чтобы ловить регрессии.
+#
+#   python -m benchmarks.run --sizes 100 1000 --renderers headless 2d
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algorithms import SortAlgorithms, algorithm_names
+from distributions import distribution_names, make_input, value_limits
+from events import AUX, COMPARE, LANE, SWAP, WRITE, advance, apply_event
+
+ALGORITHMS = algorithm_names()
+DISTRIBUTIONS = distribution_names()
+
+
+# ---------- Замеры ----------
+def bench_generator(algorithm_name, arr, max_events):
+    # Только генератор: события создаются и отбрасываются, считаются по типам
+    generator = SortAlgorithms(algorithm_name).get_generator(arr.copy())
+    counts = [0] * (LANE + 1)
+    events = 0
+    aux_memory = 0
+    start = time.perf_counter()
+    for op, a, _ in generator:
+        events += 1
+        counts[op] += 1
+        if op == AUX and a > aux_memory:
+            aux_memory = a
+        if events >= max_events:
+            break
+    seconds = time.perf_counter() - start
+    return {"events": events, "changes": counts[SWAP] + counts[WRITE], "seconds": seconds,
+            "comparisons": counts[COMPARE], "swaps": counts[SWAP], "writes": counts[WRITE],
+            "aux_memory": aux_memory, "truncated": events >= max_events}
+
+
+def bench_apply(algorithm_name, arr, max_events):
+    # Генератор + применение событий к общему буферу, как в визуализаторах
+    generator = SortAlgorithms(algorithm_name).get_generator(arr.copy())
+    buf = arr.copy()
+    events = changes = 0
+    start = time.perf_counter()
+    for event in generator:
+        events += 1
+        if apply_event(buf, event):
+            changes += 1
+        if events >= max_events:
+            break
+    seconds = time.perf_counter() - start
+    return {"events": events, "changes": changes, "seconds": seconds,
+            "truncated": events >= max_events}
+
+
+def run_frames(algorithm_name, arr, update_every, max_frames, draw):
+    generator = SortAlgorithms(algorithm_name).get_generator(arr.copy())
+    buf = arr.copy()
+    dirty = set()
+    frames = changes = 0
+    start = time.perf_counter()
+    while frames < max_frames:
+        batch = advance(generator, buf, update_every, dirty)
+        if not batch:
+            break
+        draw(dirty, buf)
+        dirty.clear()
+        changes += batch
+        frames += 1
+    seconds = time.perf_counter() - start
+    return {"frames": frames, "changes": changes, "seconds": seconds,
+            "truncated": frames >= max_frames}
+
+
+def bench_headless(algorithm_name, arr, update_every, max_frames):
+    from export import FrameRasterizer
+    rasterizer = FrameRasterizer(arr, 1280, 720)
+    return run_frames(algorithm_name, arr, update_every, max_frames, rasterizer.update)
+
+
+def agg_figure(projection=None):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(12, 6), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111, projection=projection)
+    return fig, canvas, ax
+
+
+def bench_2d(algorithm_name, arr, update_every, max_frames):
+    from export import viridis_colors
+    from bars import make_bars, set_bar_heights
+    n = len(arr)
+    fig, canvas, ax = agg_figure()
+    bars = make_bars(ax, arr, viridis_colors(n))
+    ax.set_xlim(-1, n)
+    ax.set_ylim(*value_limits(arr))
+    canvas.draw()
+
+    def draw(dirty, buf):
+        set_bar_heights(bars, dirty, buf)
+        canvas.draw()
+
+    return run_frames(algorithm_name, arr, update_every, max_frames, draw)
+
+
+def bench_3d(algorithm_name, arr, update_every, max_frames):
+    from export import viridis_colors
+    from bars3d import Bars3D
+    n = len(arr)
+    fig, canvas, ax = agg_figure("3d")
+    bars = Bars3D(ax, arr, viridis_colors(n))
+    ax.set_xlim(0, n)
+    ax.set_ylim(0, 1)
+    ax.set_zlim(*value_limits(arr))
+    canvas.draw()
+
+    def draw(dirty, buf):
+        bars.set_heights(dirty, buf)
+        canvas.draw()
+
+    return run_frames(algorithm_name, arr, update_every, max_frames, draw)
+
+
+RENDERERS = {"headless": bench_headless, "2d": bench_2d, "3d": bench_3d}
+
+
+def run_case(algorithm_name, n, distribution, args):
+    arr = make_input(distribution, n, args.seed)
+    rows = []
+    base = {"algorithm": algorithm_name, "n": n, "distribution": distribution}
+    for stage, bench in (("generator", bench_generator), ("apply", bench_apply)):
+        result = bench(algorithm_name, arr, args.max_events)
+        result["events_per_sec"] = result["events"] / result["seconds"] if result["seconds"] else 0.0
+        result["steps_per_sec"] = result["changes"] / result["seconds"] if result["seconds"] else 0.0
+        rows.append(dict(base, stage=stage, **result))
+    for renderer in args.renderers:
+        result = RENDERERS[renderer](algorithm_name, arr, args.update_every, args.max_frames)
+        result["fps"] = result["frames"] / result["seconds"] if result["seconds"] else 0.0
+        result["steps_per_sec"] = result["changes"] / result["seconds"] if result["seconds"] else 0.0
+        rows.append(dict(base, stage=renderer, **result))
+    return rows
+
+
+FIELDS = ["algorithm", "n", "distribution", "stage", "events", "changes", "comparisons", "swaps",
+          "writes", "aux_memory", "frames", "seconds", "events_per_sec", "steps_per_sec", "fps", "truncated"]
+
+
+def write_results(rows, path):
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({field: row.get(field, "") for field in FIELDS})
+    else:
+        report = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": rows,
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+# ---------- Консольный интерфейс ----------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки алгоритмов и рендереров VisualSort")
+    parser.add_argument("--algorithms", nargs="+", default=ALGORITHMS, choices=ALGORITHMS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000])
+    parser.add_argument("--distributions", nargs="+", default=["random"], choices=DISTRIBUTIONS)
+    parser.add_argument("--renderers", nargs="*", default=["headless"], choices=sorted(RENDERERS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--update-every", type=int, default=10, help="изменений массива на кадр")
+    parser.add_argument("--max-events", type=int, default=2_000_000, help="предел событий на замер генератора")
+    parser.add_argument("--max-frames", type=int, default=200, help="предел кадров на замер рендерера")
+    parser.add_argument("--output", default="bench_results.json", help="файл .json или .csv")
+    args = parser.parse_args(argv)
+
+    if "2d" in args.renderers or "3d" in args.renderers:
+        import matplotlib
+        matplotlib.use("Agg")
+
+    rows = []
+    for algorithm_name in args.algorithms:
+        for n in args.sizes:
+            for distribution in args.distributions:
+                try:
+                    case = run_case(algorithm_name, n, distribution, args)
+                except ValueError as e:
+                    # Например, поразрядная сортировка на вещественных значениях
+                    print(f"{algorithm_name:>14} n={n:<7} {distribution:<13} пропущено: {e}")
+                    continue
+                for row in case:
+                    rows.append(row)
+                    rate = f"{row['fps']:.0f} кадр/с" if "fps" in row else f"{row['events_per_sec']:.0f} событий/с"
+                    mark = " (обрезано)" if row["truncated"] else ""
+                    print(f"{algorithm_name:>14} n={n:<7} {distribution:<13} {row['stage']:<9} "
+                          f"{row['seconds']:8.3f} с  {row['steps_per_sec']:12.0f} шагов/с  {rate}{mark}")
+    write_results(rows, args.output)
+    print(f"Результаты: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Ускорение параллельных сортировок в зависимости от числа воркеров.
+# Для каждого случая - полное время генератора (вместе с выдачей событий
+# в родителе) и реальное время параллельных фаз; ускорение считается по
+# фазам относительно наименьшего числа воркеров в списке (обычно одного).
+# Запуск пула процессов в фазы не входит и выводится отдельно.
+#
+#   python -m benchmarks.speedup --sizes 1000000 --workers 1 2 4 8
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algorithms import SortAlgorithms, get_algorithm
+from distributions import make_input
+
+PARALLEL = ["mergesort_parallel", "quicksort_parallel"]
+
+
+def bench_workers(algorithm_name, arr, workers):
+    run = SortAlgorithms(algorithm_name)
+    start = time.perf_counter()
+    for _ in get_algorithm(algorithm_name).load()(arr.copy(), run, workers=workers):
+        pass
+    seconds = time.perf_counter() - start
+    return dict(run.parallel, seconds=seconds)
+
+
+# ---------- Консольный интерфейс ----------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ускорение параллельных сортировок по числу воркеров")
+    parser.add_argument("--algorithms", nargs="+", default=PARALLEL, choices=PARALLEL)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[200_000])
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--distribution", default="random")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="speedup_results.json")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for algorithm_name in args.algorithms:
+        for n in args.sizes:
+            arr = make_input(args.distribution, n, args.seed)
+            base = None
+            for workers in sorted(set(args.workers)):
+                result = bench_workers(algorithm_name, arr, workers)
+                base = base or result["wall"]
+                result["speedup_vs_1"] = base / result["wall"] if result["wall"] else 0.0
+                rows.append(dict(result, algorithm=algorithm_name, n=n, requested_workers=workers))
+                print(f"{algorithm_name:>18} n={n:<8} воркеров: {result['workers']:<3} "
+                      f"всего {result['seconds']:8.3f} с  фазы {result['wall']:8.3f} с  "
+                      f"запуск пула {result['startup']:6.3f} с  ускорение ×{result['speedup_vs_1']:.2f}")
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": rows,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Результаты: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Генераторы входных данных разной формы. Случайная перестановка не
+# показывает ни адаптивность (вставки, ранний выход пузырька), ни слабые
+# места фиксированного опорного элемента, поэтому визуализаторы, экспорт,
+# трассы и бенчмарки берут вход отсюда. Генерация векторизована на NumPy
+# и воспроизводима по seed; значения положительные, высота столбца - значение.
+import numpy as np
+
+
+def random_permutation(n, rng):
+    return rng.permutation(np.arange(1, n + 1))
+
+
+def sorted_input(n, rng):
+    return np.arange(1, n + 1)
+
+
+def reversed_input(n, rng):
+    return np.arange(n, 0, -1)
+
+
+def nearly_sorted(n, rng, swaps=None):
+    # Отсортированный массив и k случайных обменов (по умолчанию 2% от n)
+    arr = np.arange(1, n + 1)
+    if n < 2:
+        return arr
+    k = max(1, n // 50) if swaps is None else swaps
+    pairs = rng.integers(0, n, size=(k, 2))
+    # Обмены по одному: последовательные перестановки могут задевать общие индексы
+    for i, j in pairs:
+        arr[i], arr[j] = arr[j], arr[i]
+    return arr
+
+
+def sawtooth(n, rng, teeth=4):
+    # teeth возрастающих серий, каждая на всю высоту: 1, 5, 9, ..., 2, 6, 10, ...
+    teeth = max(1, min(teeth, n))
+    return np.concatenate([np.arange(1 + t, n + 1, teeth) for t in range(teeth)]).astype(np.int64)
+
+
+def organ_pipe(n, rng):
+    # Возрастание до середины, затем убывание
+    arr = np.arange(1, n + 1)
+    return np.concatenate([arr[0::2], arr[1::2][::-1]])
+
+
+def few_unique(n, rng, unique=8):
+    # Несколько различных значений, равномерно по высоте
+    unique = max(1, min(unique, n))
+    return (rng.integers(0, unique, size=n) + 1) * n // unique
+
+
+def zipf_duplicates(n, rng, a=1.5):
+    # Частота значения убывает по закону Ципфа: много повторов малых значений
+    return np.minimum(rng.zipf(a, size=n), n)
+
+
+def float_range(n, rng, high=1e9):
+    # Вещественные значения из большого диапазона, почти без повторов
+    return rng.uniform(0.0, high, size=n)
+
+
+DISTRIBUTIONS = {
+    "random": (random_permutation, "Случайная перестановка"),
+    "sorted": (sorted_input, "Уже отсортирован"),
+    "reversed": (reversed_input, "Обратный порядок"),
+    "nearly_sorted": (nearly_sorted, "Почти отсортирован"),
+    "sawtooth": (sawtooth, "Пила"),
+    "organ_pipe": (organ_pipe, "Органные трубы"),
+    "few_unique": (few_unique, "Мало различных значений"),
+    "zipf": (zipf_duplicates, "Повторы по Ципфу"),
+    "float_range": (float_range, "Вещественные, большой диапазон"),
+}
+
+
+def distribution_names():
+    return list(DISTRIBUTIONS)
+
+
+def make_array(distribution, n, seed=None, **params):
+    try:
+        func = DISTRIBUTIONS[distribution][0]
+    except KeyError:
+        raise ValueError(f"Неизвестное распределение: {distribution}")
+    return func(n, np.random.default_rng(seed), **params)
+
+
+def make_input(distribution, n, seed=None, **params):
+    # Список чисел Python: генераторы сортировки работают со списками
+    return make_array(distribution, n, seed, **params).tolist()
+
+
+def value_limits(arr):
+    # Пределы оси значений: от нуля до максимума с запасом в один "шаг" высоты
+    n = len(arr)
+    if n == 0:
+        return 0, 1
+    low = min(0, min(arr))
+    high = max(arr)
+    return low, high + (high - low) / n
@@ -0,0 +1,81 @@
+# Протокол событий для генераторов сортировки.
+# Вместо копии всего массива на каждом шаге генераторы выдают короткие
+# кортежи (тип, a, b). Визуализатор держит один общий буфер и применяет
+# к нему события на месте, поэтому шаг стоит O(1), а не O(n).
+
+SWAP = 0     # (SWAP, i, j)      - обмен arr[i] и arr[j]
+WRITE = 1    # (WRITE, i, value) - запись arr[i] = value
+COMPARE = 2  # (COMPARE, i, j)   - сравнение arr[i] и arr[j], массив не меняется
+PIVOT = 3    # (PIVOT, k, 0)     - опорный элемент на позиции k
+AUX = 4      # (AUX, size, 0)    - текущий объём вспомогательной памяти в элементах
+LANE = 5     # (LANE, start, w)  - позиции start.. принадлежат воркеру w (-1 - никому)
+
+EVENT_NAMES = {
+    SWAP: "swap",
+    WRITE: "write",
+    COMPARE: "compare",
+    PIVOT: "pivot",
+    AUX: "aux",
+    LANE: "lane",
+}
+
+
+def apply_event(buf, event):
+    # Применяет событие к буферу. Возвращает True, если буфер изменился.
+    op, a, b = event
+    if op == SWAP:
+        buf[a], buf[b] = buf[b], buf[a]
+        return True
+    if op == WRITE:
+        buf[a] = b
+        return True
+    return False
+
+
+def changed_indices(event):
+    # Индексы буфера, затронутые событием
+    op, a, b = event
+    if op == SWAP:
+        return (a, b)
+    if op == WRITE:
+        return (a,)
+    return ()
+
+
+def next_change(generator, buf, highlights=None):
+    # Продвигает генератор до ближайшего события, меняющего буфер,
+    # и применяет все пройденные события. None - генератор закончился.
+    # Если передан highlights (palette.Highlights) - в нём отмечаются затронутые позиции.
+    for event in generator:
+        if highlights is not None:
+            highlights.add(event)
+        if apply_event(buf, event):
+            return event
+    return None
+
+
+def advance(generator, buf, max_changes, dirty=None, stats=None, history=None, lanes=None, highlights=None):
+    # Применяет события, пока буфер не изменится max_changes раз.
+    # Возвращает число применённых изменений; 0 - генератор закончился.
+    # Если передано множество dirty, в него добавляются изменённые индексы,
+    # если передан stats (instrumentation.SortStats) - события учитываются в нём,
+    # если передан history (history.History) - изменения записываются в историю,
+    # если передан lanes (lanes.LaneMap) - в нём отмечаются события LANE,
+    # если передан highlights (palette.Highlights) - в нём отмечаются затронутые позиции.
+    changes = 0
+    for event in generator:
+        if stats is not None:
+            stats.count(event)
+        if lanes is not None and event[0] == LANE:
+            lanes.apply(event)
+        if highlights is not None:
+            highlights.add(event)
+        if apply_event(buf, event):
+            if dirty is not None:
+                dirty.update(changed_indices(event))
+            if history is not None:
+                history.append(event)
+            changes += 1
+            if changes >= max_changes:
+                break
+    return changes
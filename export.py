@@ -0,0 +1,318 @@
+# Офлайн-экспорт сортировки в MP4 / GIF / последовательность PNG без дисплея.
+# Кадры рисуются прямо в NumPy-буфер RGB заливкой столбцов пикселей,
+# без объектов matplotlib; на кадр перерисовываются только изменённые столбцы.
+import argparse
+import math
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from algorithms import SortAlgorithms, algorithm_names
+from distributions import distribution_names, make_input
+from events import advance
+
+
+def viridis_colors(n):
+    from matplotlib import colormaps
+    return colormaps["viridis"](np.linspace(0, 1, n))
+
+
+class FrameRasterizer:
+    def __init__(self, values, width=None, height=None, colors=None, background=(0, 0, 0)):
+        n = len(values)
+        self.n = n
+        self.width = width or min(max(n, 2), 1920)
+        self.height = height or 720
+        self.values = np.array(values, dtype=float)
+        self.vmax = max(float(self.values.max(initial=0)), 1e-12)
+        self.background = np.array(background, dtype=np.uint8)
+
+        # Пиксельный столбец px показывает максимум значений [starts[px], ends[px]).
+        # При n > width несколько значений попадают в один столбец (биннинг),
+        # при n < width одно значение занимает несколько столбцов.
+        px = np.arange(self.width)
+        self.starts = px * n // self.width
+        self.ends = np.maximum((px + 1) * n // self.width, self.starts + 1)
+        # Для каждого индекса массива - диапазон пиксельных столбцов [lo, hi)
+        idx = np.arange(n)
+        self.px_lo = np.searchsorted(self.ends, idx, side="right")
+        self.px_hi = np.searchsorted(self.starts, idx, side="right")
+
+        if colors is None:
+            colors = viridis_colors(n)
+        colors = np.asarray(colors, dtype=float)
+        if colors.max(initial=0) <= 1.0:
+            colors = colors * 255
+        self.column_colors = colors[self.starts, :3].astype(np.uint8)
+
+        self.column_heights = np.zeros(self.width, dtype=np.intp)
+        self.frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self.redraw()
+
+    def pixel_heights(self, columns):
+        if self.n <= self.width:
+            peaks = self.values[self.starts[columns]]
+        else:
+            peaks = np.array([self.values[self.starts[c]:self.ends[c]].max() for c in columns])
+        return np.rint(peaks / self.vmax * self.height).astype(np.intp)
+
+    def redraw(self):
+        columns = np.arange(self.width)
+        self.column_heights = self.pixel_heights(columns)
+        rows = np.arange(self.height)[:, None]
+        filled = rows >= self.height - self.column_heights[None, :]
+        self.frame[:] = self.background
+        self.frame[filled] = np.broadcast_to(self.column_colors, self.frame.shape)[filled]
+
+    def update(self, indices, buf):
+        # indices - изменённые позиции (множество или массив NumPy),
+        # buf - текущий буфер целиком (список или массив NumPy)
+        if len(indices) == 0:
+            return
+        if isinstance(indices, np.ndarray):
+            indices = indices.astype(np.intp)
+        else:
+            indices = np.fromiter(indices, dtype=np.intp, count=len(indices))
+        if isinstance(buf, np.ndarray):
+            self.values[indices] = buf[indices]
+        else:
+            self.values[indices] = [buf[k] for k in indices.tolist()]
+        # Пиксельные столбцы всех индексов: диапазоны [px_lo, px_hi) подряд
+        lo = self.px_lo[indices]
+        counts = self.px_hi[indices] - lo
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        columns = np.unique(np.repeat(lo, counts) + offsets)
+        heights = self.pixel_heights(columns)
+        changed = heights != self.column_heights[columns]
+        for c, h in zip(columns[changed].tolist(), heights[changed].tolist()):
+            self.frame[:self.height - h, c] = self.background
+            self.frame[self.height - h:, c] = self.column_colors[c]
+        self.column_heights[columns] = heights
+
+
+# ---------- Запись кадров ----------
+def png_bytes(frame, level=1):
+    height, width, _ = frame.shape
+    raw = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 0] = 0  # фильтр None для каждой строки
+    raw[:, 1:] = frame.reshape(height, width * 3)
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw.tobytes(), level)) + chunk(b"IEND", b""))
+
+
+class PngSequenceWriter:
+    def __init__(self, directory, width, height, fps, first_frame=0):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.count = first_frame
+
+    def write(self, frame):
+        path = os.path.join(self.directory, f"frame_{self.count:07d}.png")
+        with open(path, "wb") as f:
+            f.write(png_bytes(frame))
+        self.count += 1
+
+    def close(self):
+        pass
+
+
+class GifWriter:
+    def __init__(self, path, width, height, fps):
+        try:
+            from PIL import Image
+        except ImportError:
+            raise RuntimeError("Для экспорта в GIF нужен Pillow: pip install pillow")
+        self.image = Image
+        self.path = path
+        self.duration = max(1, round(1000 / fps))
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(self.image.fromarray(frame).quantize(colors=256))
+
+    def close(self):
+        if self.frames:
+            self.frames[0].save(self.path, save_all=True, append_images=self.frames[1:],
+                                duration=self.duration, loop=0)
+
+
+class FFmpegWriter:
+    def __init__(self, path, width, height, fps):
+        if shutil.which("ffmpeg") is None:
+            raise RuntimeError("Для экспорта в видео нужен ffmpeg в PATH")
+        self.process = subprocess.Popen(
+            ["ffmpeg", "-y", "-loglevel", "error",
+             "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps),
+             "-i", "-", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",  # yuv420p требует чётных размеров
+             "-pix_fmt", "yuv420p", "-vcodec", "libx264", path],
+            stdin=subprocess.PIPE,
+        )
+
+    def write(self, frame):
+        self.process.stdin.write(frame.tobytes())
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".webm", ".mov")
+
+
+def open_writer(path, width, height, fps):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".gif":
+        return GifWriter(path, width, height, fps)
+    if ext in VIDEO_EXTENSIONS:
+        return FFmpegWriter(path, width, height, fps)
+    return PngSequenceWriter(path, width, height, fps)
+
+
+def export_sort(algorithm_name, array_size, path, fps=30, update_every=10,
+                width=None, height=None, seed=None, distribution="random"):
+    arr = make_input(distribution, array_size, seed)
+    algorithm = SortAlgorithms(algorithm_name)
+    generator = algorithm.get_generator(arr.copy())
+    buf = arr.copy()
+
+    rasterizer = FrameRasterizer(buf, width, height)
+    writer = open_writer(path, rasterizer.width, rasterizer.height, fps)
+    writer.write(rasterizer.frame)
+    frames = 1
+    dirty = set()
+    try:
+        while advance(generator, buf, update_every, dirty):
+            rasterizer.update(dirty, buf)
+            writer.write(rasterizer.frame)
+            frames += 1
+            dirty.clear()
+    finally:
+        writer.close()
+    return frames, algorithm.final_message
+
+
+# ---------- Параллельный рендер трассы ----------
+def frame_steps(trace, update_every):
+    # Шаги трассы, после которых снимается кадр: 0 (исходный массив), затем каждые
+    # update_every изменений и последний шаг - те же кадры, что даёт export_sort
+    changes = trace.change_steps()
+    steps = [0] + changes[update_every - 1::update_every].tolist()
+    if len(changes) and steps[-1] != changes[-1]:
+        steps.append(int(changes[-1]))
+    return steps
+
+
+def render_chunk(trace_path, steps, first_frame, output, kind, width, height, fps):
+    # Воркер: восстанавливает состояние из ближайшего ключевого кадра трассы
+    # и рендерит кадры на шагах steps. PNG пишутся сразу с глобальными номерами,
+    # видео - отдельным сегментом, кадры GIF возвращаются родителю.
+    from tracefile import Trace
+    trace = Trace(trace_path)
+    state = trace.state_array(steps[0])
+    rasterizer = FrameRasterizer(state, width, height)
+    if kind == "png":
+        writer = PngSequenceWriter(output, rasterizer.width, rasterizer.height, fps, first_frame)
+    elif kind == "video":
+        output = os.path.join(output, f"segment_{first_frame:09d}{VIDEO_EXTENSIONS[0]}")
+        writer = FFmpegWriter(output, rasterizer.width, rasterizer.height, fps)
+    frames = []
+    for previous, step in zip([steps[0]] + steps, steps):
+        dirty, _ = trace.replay(state, previous, step)
+        rasterizer.update(dirty, state)
+        if kind == "gif":
+            frames.append(rasterizer.frame.copy())
+        else:
+            writer.write(rasterizer.frame)
+    if kind == "gif":
+        return frames
+    writer.close()
+    return output
+
+
+def export_trace(trace_path, path, fps=30, update_every=10, width=None, height=None, workers=None):
+    from tracefile import Trace
+    trace = Trace(trace_path)
+    steps = frame_steps(trace, update_every)
+    workers = workers or os.cpu_count() or 1
+    width = width or min(max(trace.n, 2), 1920)
+    height = height or 720
+    # Кусков больше, чем воркеров, - для балансировки нагрузки
+    chunk = max(1, math.ceil(len(steps) / (workers * 4)))
+    starts = range(0, len(steps), chunk)
+
+    ext = os.path.splitext(path)[1].lower()
+    kind = "gif" if ext == ".gif" else "video" if ext in VIDEO_EXTENSIONS else "png"
+    workdir = tempfile.mkdtemp(prefix="visualsort_") if kind == "video" else path
+    if kind == "png":
+        os.makedirs(path, exist_ok=True)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(
+                render_chunk,
+                [trace_path] * len(starts),
+                [steps[start:start + chunk] for start in starts],
+                starts,
+                [workdir] * len(starts),
+                [kind] * len(starts),
+                [width] * len(starts),
+                [height] * len(starts),
+                [fps] * len(starts),
+            ))
+        if kind == "gif":
+            writer = GifWriter(path, width, height, fps)
+            for frames in results:
+                for frame in frames:
+                    writer.write(frame)
+            writer.close()
+        elif kind == "video":
+            concat_segments(results, path, workdir)
+    finally:
+        if kind == "video":
+            shutil.rmtree(workdir, ignore_errors=True)
+    return len(steps)
+
+
+def concat_segments(segments, path, workdir):
+    listing = os.path.join(workdir, "segments.txt")
+    with open(listing, "w") as f:
+        for segment in segments:
+            f.write(f"file '{os.path.abspath(segment)}'\n")
+    subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                    "-i", listing, "-c", "copy", path], check=True)
+
+
+# ---------- Консольный интерфейс ----------
+def main():
+    parser = argparse.ArgumentParser(description="Экспорт визуализации сортировки в файл без дисплея")
+    parser.add_argument("algorithm", help=", ".join(algorithm_names()))
+    parser.add_argument("size", type=int, help="размер массива")
+    parser.add_argument("output", help="файл .mp4/.gif или каталог для PNG-кадров")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--update-every", type=int, default=10, help="изменений массива на кадр")
+    parser.add_argument("--width", type=int)
+    parser.add_argument("--height", type=int)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--distribution", default="random", choices=distribution_names())
+    args = parser.parse_args()
+
+    frames, message = export_sort(args.algorithm, args.size, args.output, fps=args.fps,
+                                  update_every=args.update_every, width=args.width,
+                                  height=args.height, seed=args.seed,
+                                  distribution=args.distribution)
+    print(f"{args.algorithm}: {message}, кадров: {frames} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+# Внешняя сортировка слиянием для данных больше оперативной памяти.
+# Фаза runs: вход (двоичный файл одного dtype или CSV с числами) читается
+# кусками, которые помещаются в бюджет памяти; каждый кусок сортируется
+# NumPy и пишется отдельной серией через numpy.memmap во временный каталог.
+# Фаза merge: k-путевое слияние серий с буферизованным последовательным
+# чтением. Куча хранит последние элементы буферов: минимальный из них - граница,
+# все элементы не больше неё из всех буферов идут в выход одним блоком,
+# а исчерпанный буфер дочитывается. Так куча работает на уровне блоков,
+# а не отдельных чисел. По каждой фазе считаются байты чтения/записи и скорость.
+#
+#   python external.py generate data.bin --count 100000000
+#   python external.py sort data.bin sorted.bin --memory 256 --show
+import argparse
+import heapq
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from distributions import DISTRIBUTIONS, make_array
+from profiler import make_profiler
+
+MB = 2 ** 20
+
+
+class PhaseStats:
+    def __init__(self, name):
+        self.name = name
+        self.read = 0
+        self.written = 0
+        self.seconds = 0.0
+
+    def rate(self, count):
+        return count / self.seconds / MB if self.seconds else 0.0
+
+    def summary(self):
+        return (f"{self.name}: {self.seconds:.2f} с, чтение {self.read / MB:.1f} МБ "
+                f"({self.rate(self.read):.1f} МБ/с), запись {self.written / MB:.1f} МБ "
+                f"({self.rate(self.written):.1f} МБ/с)")
+
+
+# ---------- Ввод и вывод ----------
+def is_csv(path):
+    return path.lower().endswith((".csv", ".txt"))
+
+
+def read_binary(path, dtype, chunk_items, stats):
+    with open(path, "rb") as f:
+        while True:
+            chunk = np.fromfile(f, dtype=dtype, count=chunk_items)
+            if len(chunk) == 0:
+                return
+            stats.read += chunk.nbytes
+            yield chunk
+
+
+def read_csv(path, dtype, chunk_items, stats):
+    # Числа через запятую, пробел или перевод строки; строки читаются пачками
+    # примерно по chunk_items чисел (оценка - 16 байт текста на число)
+    with open(path, "r") as f:
+        while True:
+            lines = f.readlines(chunk_items * 16)
+            if not lines:
+                return
+            text = "".join(lines)
+            stats.read += len(text)
+            chunk = np.array(text.replace(",", " ").split(), dtype=dtype)
+            if len(chunk):
+                yield chunk
+
+
+class OutputWriter:
+    def __init__(self, path, stats):
+        self.csv = is_csv(path)
+        self.file = open(path, "w" if self.csv else "wb")
+        self.stats = stats
+        self.count = 0
+
+    def write(self, block):
+        if self.csv:
+            data = "\n".join(map(str, block.tolist())) + "\n"
+            self.file.write(data)
+            self.stats.written += len(data)
+        else:
+            block.tofile(self.file)
+            self.stats.written += block.nbytes
+        self.count += len(block)
+
+    def close(self):
+        self.file.close()
+
+
+class RunReader:
+    # Последовательное чтение серии из memmap буферами по buffer_items элементов
+    def __init__(self, path, dtype, length, buffer_items, stats):
+        self.data = np.memmap(path, dtype=dtype, mode="r", shape=(length,)) if length else np.zeros(0, dtype)
+        self.length = length
+        self.buffer_items = buffer_items
+        self.stats = stats
+        self.position = 0
+        self.buffer = np.zeros(0, dtype)
+        self.refill()
+
+    def refill(self):
+        stop = min(self.position + self.buffer_items, self.length)
+        self.buffer = np.array(self.data[self.position:stop])
+        self.stats.read += self.buffer.nbytes
+        self.position = stop
+
+    @property
+    def consumed(self):
+        return self.position - len(self.buffer)
+
+
+# ---------- Сортировка ----------
+class ExternalSort:
+    def __init__(self, source, output, memory=256 * MB, dtype="float64", tmpdir=None):
+        self.source = source
+        self.output = output
+        self.memory = memory  # байт на данные: кусок в фазе runs, все буферы в фазе merge
+        self.dtype = np.dtype(dtype)
+        self.tmpdir = tmpdir
+        self.chunk_items = max(1, memory // self.dtype.itemsize)
+        self.runs = []  # (путь, длина)
+        self.readers = []
+        self.total = 0
+        self.writer = None
+        self.phases = {"runs": PhaseStats("runs"), "merge": PhaseStats("merge")}
+        self.phase = "runs"
+
+    def total_items(self):
+        # Для двоичного входа размер известен заранее, для CSV - только после фазы runs
+        if is_csv(self.source):
+            return None
+        return os.path.getsize(self.source) // self.dtype.itemsize
+
+    def run(self):
+        # Генератор: после каждого куска и каждого блока слияния отдаёт управление
+        # визуализатору; сам прогресс читается из атрибутов
+        with tempfile.TemporaryDirectory(prefix="visualsort-", dir=self.tmpdir) as directory:
+            yield from self.make_runs(directory)
+            yield from self.merge_runs()
+            self.readers = []
+
+    def make_runs(self, directory):
+        stats = self.phases["runs"]
+        reader = read_csv if is_csv(self.source) else read_binary
+        started = time.perf_counter()
+        for chunk in reader(self.source, self.dtype, self.chunk_items, stats):
+            chunk.sort()
+            path = os.path.join(directory, f"run{len(self.runs):05d}.bin")
+            run = np.memmap(path, dtype=self.dtype, mode="w+", shape=(len(chunk),))
+            run[:] = chunk
+            run.flush()
+            del run
+            stats.written += chunk.nbytes
+            self.runs.append((path, len(chunk)))
+            self.total += len(chunk)
+            stats.seconds = time.perf_counter() - started
+            yield
+
+    def merge_runs(self):
+        self.phase = "merge"
+        stats = self.phases["merge"]
+        started = time.perf_counter()
+        # Бюджет делится на буферы серий и выходной блок того же размера
+        buffer_items = max(1, self.chunk_items // (len(self.runs) + 1))
+        self.readers = [RunReader(path, self.dtype, length, buffer_items, stats) for path, length in self.runs]
+        self.writer = OutputWriter(self.output, stats)
+        heap = [(reader.buffer[-1], k) for k, reader in enumerate(self.readers) if len(reader.buffer)]
+        heapq.heapify(heap)
+        try:
+            while heap:
+                bound, k = heap[0]
+                # Всё, что не больше границы, во всех буферах уже окончательно на месте
+                parts = []
+                for reader in self.readers:
+                    take = np.searchsorted(reader.buffer, bound, side="right")
+                    if take:
+                        parts.append(reader.buffer[:take])
+                        reader.buffer = reader.buffer[take:]
+                block = np.concatenate(parts)
+                block.sort(kind="stable")
+                self.writer.write(block)
+                # Исчерпанные буферы дочитываются, их элементы в куче обновляются
+                while heap and len(self.readers[heap[0][1]].buffer) == 0:
+                    _, k = heapq.heappop(heap)
+                    reader = self.readers[k]
+                    reader.refill()
+                    if len(reader.buffer):
+                        heapq.heappush(heap, (reader.buffer[-1], k))
+                stats.seconds = time.perf_counter() - started
+                yield
+        finally:
+            self.writer.close()
+        stats.seconds = time.perf_counter() - started
+
+    def sort(self):
+        for _ in self.run():
+            pass
+
+    def summary(self):
+        return "\n".join(phase.summary() for phase in self.phases.values())
+
+
+# ---------- Визуализатор ----------
+class ExternalSortVisualizer:
+    # Сверху - серии (доля записанного в runs, доля прочитанного в merge),
+    # снизу - прореженный вид выходного файла по мере заполнения
+    def __init__(self, sorter, samples=1000, interval=30):
+        self.sorter = sorter
+        self.samples = samples
+        self.interval = interval
+        self.steps = sorter.run()
+        self.completed = False
+        # Длина выхода: у двоичного входа известна сразу, у CSV - после фазы runs
+        self.expected = sorter.total_items()
+        self.profiler = make_profiler("external")  # VISUALSORT_PROFILE
+
+    def init_figure(self):
+        from gui import pyplot
+        plt = pyplot()
+        self.fig, (self.runs_ax, self.out_ax) = plt.subplots(2, 1, figsize=(12, 8),
+                                                             gridspec_kw={"height_ratios": [1, 2]})
+        self.run_bars = None
+        self.output_line, = self.out_ax.plot([], [], ".", markersize=2)
+        self.out_ax.set_xlabel("позиция в выходном файле")
+        self.out_ax.set_ylabel("значение")
+
+    def draw_runs(self):
+        sorter = self.sorter
+        count = len(sorter.runs)
+        if sorter.phase == "runs":
+            done = np.ones(count)
+        else:
+            done = np.array([1 - reader.consumed / max(1, reader.length) for reader in sorter.readers])
+        if self.run_bars is None or len(self.run_bars) != count:
+            self.runs_ax.clear()
+            self.run_bars = self.runs_ax.bar(np.arange(count), done, width=0.8, color="tab:blue")
+            self.runs_ax.set_ylim(0, 1)
+            # Серий будет expected / chunk_items - ось сразу на все, а не растёт с каждой
+            expected_runs = -(-(self.expected or 0) // sorter.chunk_items)
+            self.runs_ax.set_xlim(-1, max(count, expected_runs, 1))
+            self.runs_ax.set_ylabel("серии")
+        else:
+            for bar, value in zip(self.run_bars, done):
+                bar.set_height(value)
+
+    def draw_output(self):
+        writer = self.sorter.writer
+        if writer is None or writer.count == 0 or writer.csv:
+            return
+        if not writer.file.closed:
+            writer.file.flush()
+        data = np.memmap(self.sorter.output, dtype=self.sorter.dtype, mode="r", shape=(writer.count,))
+        total = self.expected or self.sorter.total
+        stride = max(1, total // self.samples)
+        positions = np.arange(0, writer.count, stride)
+        self.output_line.set_data(positions, np.array(data[positions]))
+        self.out_ax.set_xlim(0, max(total, 1))
+        low, high = data[0], data[writer.count - 1]
+        self.out_ax.set_ylim(low, high if high > low else low + 1)
+
+    def update_animation(self, _):
+        if not self.completed:
+            with self.profiler.span("frame"):
+                with self.profiler.span(self.sorter.phase):
+                    finished = next(self.steps, StopIteration) is StopIteration
+                if finished:
+                    self.completed = True
+                    self.anim.event_source.stop()
+                    print(self.sorter.summary())
+                stats = self.sorter.phases[self.sorter.phase]
+                with self.profiler.span("render"):
+                    self.draw_runs()
+                    self.draw_output()
+                    self.fig.suptitle(f"Внешняя сортировка: {stats.summary()}")
+        return []
+
+    def visualize(self):
+        from matplotlib.animation import FuncAnimation
+        from gui import show
+        self.init_figure()
+        self.anim = FuncAnimation(self.fig, self.update_animation, interval=self.interval,
+                                  blit=False, cache_frame_data=False, repeat=False)
+        self.profiler.instrument_canvas(self.fig.canvas)
+        with self.profiler.span("visualize"):
+            show()
+        self.profiler.dump()
+
+
+# ---------- Тестовые данные ----------
+def generate(path, count, distribution="float_range", dtype="float64", seed=0, chunk_items=8 * MB):
+    # Файл пишется кусками: каждый кусок - свой вход заданной формы
+    seeds = np.random.SeedSequence(seed).spawn(-(-count // chunk_items))
+    with open(path, "w" if is_csv(path) else "wb") as f:
+        for k, child in enumerate(seeds):
+            size = min(chunk_items, count - k * chunk_items)
+            chunk = make_array(distribution, size, child).astype(dtype)
+            if is_csv(path):
+                f.write("\n".join(map(str, chunk.tolist())) + "\n")
+            else:
+                chunk.tofile(f)
+
+
+# ---------- Консольный интерфейс ----------
+def main():
+    parser = argparse.ArgumentParser(description="Внешняя сортировка файлов больше оперативной памяти")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sort = commands.add_parser("sort", help="отсортировать двоичный или CSV-файл")
+    sort.add_argument("input")
+    sort.add_argument("output")
+    sort.add_argument("--dtype", default="float64", help="тип элементов двоичного файла")
+    sort.add_argument("--memory", type=float, default=256, help="бюджет памяти, МБ")
+    sort.add_argument("--tmpdir", help="каталог для временных серий")
+    sort.add_argument("--show", action="store_true", help="показать ход сортировки")
+    gen = commands.add_parser("generate", help="создать файл с тестовыми данными")
+    gen.add_argument("output")
+    gen.add_argument("--count", type=int, required=True)
+    gen.add_argument("--distribution", default="float_range", choices=list(DISTRIBUTIONS))
+    gen.add_argument("--dtype", default="float64")
+    gen.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        generate(args.output, args.count, args.distribution, args.dtype, args.seed)
+        print(f"{args.output}: {args.count} элементов")
+        return
+    sorter = ExternalSort(args.input, args.output, int(args.memory * MB), args.dtype, args.tmpdir)
+    if args.show:
+        ExternalSortVisualizer(sorter).visualize()
+    else:
+        sorter.sort()
+        print(f"{args.output}: {sorter.total} элементов, серий: {len(sorter.runs)}")
+        print(sorter.summary())
+
+
+if __name__ == "__main__":
+    main()
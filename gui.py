@@ -0,0 +1,61 @@
+# Ленивый импорт pyplot и выбор бэкенда matplotlib.
+# Алгоритмы, трассы, экспорт и воркеры не тянут GUI: бэкенд выбирается и
+# pyplot загружается только когда визуализатор создаёт окно.
+# Порядок: Qt -> Tk -> Agg. MPLBACKEND или VISUALSORT_BACKEND задают бэкенд
+# явно, VISUALSORT_HEADLESS=1 (или отсутствие дисплея) - без окна, Agg.
+import importlib.util
+import os
+import sys
+
+BACKENDS = [
+    ("QtAgg", ("PyQt6", "PySide6", "PyQt5", "PySide2")),
+    ("TkAgg", ("tkinter",)),
+]
+
+
+def has_display():
+    if sys.platform.startswith("linux"):
+        return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+    return True
+
+
+def candidate_backends():
+    forced = os.environ.get("VISUALSORT_BACKEND")
+    if forced:
+        return [forced, "Agg"]
+    if os.environ.get("VISUALSORT_HEADLESS") or not has_display():
+        return ["Agg"]
+    found = [backend for backend, modules in BACKENDS
+             if any(importlib.util.find_spec(module) for module in modules)]
+    return found + ["Agg"]
+
+
+# Не интерактивные бэкенды matplotlib: окно не открывается
+FILE_BACKENDS = {"agg", "cairo", "pdf", "pgf", "ps", "svg", "template"}
+
+configured = False
+
+
+def pyplot():
+    global configured
+    import matplotlib.pyplot as plt
+    if not configured:
+        configured = True
+        if "MPLBACKEND" not in os.environ:
+            for backend in candidate_backends():
+                try:
+                    plt.switch_backend(backend)
+                    break
+                except ImportError:
+                    # Модуль найден, но бэкенд не поднялся (нет libGL, дисплея и т.п.)
+                    continue
+    return plt
+
+
+def show():
+    plt = pyplot()
+    if plt.get_backend().lower() in FILE_BACKENDS:
+        print("Нет графического окружения - окно не открыто. "
+              "Для записи анимации без окна используйте export.py или tracefile.py")
+    else:
+        plt.show()
@@ -0,0 +1,105 @@
+# История прогона в памяти для перемотки назад и пошагового просмотра.
+# Хранятся только изменения массива (swap/write) в формате событий трассы
+# и ключевые кадры - копии массива через каждые interval изменений. Состояние
+# на любом шаге = ближайший ключевой кадр + векторное применение остатка
+# (replay.apply_block), поэтому переход стоит O(n + interval), а не O(шагов).
+# Память ограничена бюджетом: интервал подбирается по n и ожидаемому числу
+# шагов, а при переполнении отбрасываются самые старые участки истории.
+#
+# Бюджет - VISUALSORT_HISTORY_MB (по умолчанию 64) на окно визуализатора.
+import math
+import os
+
+import numpy as np
+
+from events import WRITE
+from replay import apply_block, diff_state
+from tracefile import EVENT_DTYPE
+
+DEFAULT_HISTORY_MB = 64
+# Верхняя граница интервала: обмены в остатке применяются по одному,
+# 16k обменов - около 10 мс даже на медленной машине
+MAX_INTERVAL = 16384
+MIN_INTERVAL = 256
+
+
+def history_budget():
+    return int(float(os.environ.get("VISUALSORT_HISTORY_MB", DEFAULT_HISTORY_MB)) * 2 ** 20)
+
+
+def choose_interval(n, expected_steps, budget):
+    # Ключевые кадры получают половину бюджета: steps / interval кадров по 8n байт
+    keyframes_budget = max(budget // 2, 8 * n)
+    interval = math.ceil(expected_steps * 8 * n / keyframes_budget) if expected_steps else MIN_INTERVAL
+    return max(MIN_INTERVAL, min(MAX_INTERVAL, interval))
+
+
+class History:
+    def __init__(self, initial, expected_steps=None, budget=None, interval=None):
+        self.n = len(initial)
+        self.budget = history_budget() if budget is None else budget
+        self.interval = interval or choose_interval(self.n, expected_steps, self.budget)
+        self.first_chunk = 0  # номер самого старого сохранённого участка
+        self.keyframes = [np.array(initial, dtype=float)]
+        self.chunks = []  # заполненные участки: массивы EVENT_DTYPE длины interval
+        self.pending = []  # изменения текущего участка
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def first_step(self):
+        # Самый ранний шаг, до которого ещё можно перемотать
+        return self.first_chunk * self.interval
+
+    @property
+    def nbytes(self):
+        chunk_bytes = self.interval * EVENT_DTYPE.itemsize
+        return len(self.keyframes) * self.n * 8 + len(self.chunks) * chunk_bytes + len(self.pending) * 32
+
+    def append(self, event):
+        # event - изменение массива (SWAP или WRITE), уже применённое к буферу
+        if event[0] > WRITE:
+            return
+        self.pending.append(event)
+        self.count += 1
+        if len(self.pending) == self.interval:
+            chunk = np.array(self.pending, dtype=EVENT_DTYPE)
+            keyframe = self.keyframes[-1].copy()
+            apply_block(keyframe, chunk["op"], chunk["a"], chunk["b"])
+            self.chunks.append(chunk)
+            self.keyframes.append(keyframe)
+            self.pending = []
+            # Бюджет превышен - отбрасываем старые участки, последний оставляем всегда
+            while self.nbytes > self.budget and len(self.chunks) > 1:
+                del self.chunks[0]
+                del self.keyframes[0]
+                self.first_chunk += 1
+
+    def events_of(self, chunk):
+        if chunk - self.first_chunk < len(self.chunks):
+            return self.chunks[chunk - self.first_chunk]
+        return np.array(self.pending, dtype=EVENT_DTYPE)
+
+    def clamp(self, step):
+        return max(self.first_step, min(step, self.count))
+
+    def state_at(self, step):
+        # Массив после первых step изменений (шаг ограничивается доступной историей)
+        step = self.clamp(step)
+        chunk = step // self.interval
+        state = self.keyframes[chunk - self.first_chunk].copy()
+        events = self.events_of(chunk)[:step - chunk * self.interval]
+        apply_block(state, events["op"], events["a"], events["b"])
+        return state
+
+    def seek(self, buf, current, step):
+        # Переводит buf (np.ndarray) из состояния после current изменений в состояние
+        # после step; возвращает (dirty, heights) - как tracefile.Trace.replay
+        step = self.clamp(step)
+        if current <= step and current // self.interval == step // self.interval and current >= self.first_step:
+            chunk = step // self.interval
+            events = self.events_of(chunk)[current - chunk * self.interval:step - chunk * self.interval]
+            return apply_block(buf, events["op"], events["a"], events["b"])
+        return diff_state(buf, self.state_at(step))
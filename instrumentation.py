@@ -0,0 +1,122 @@
+# Счётчики операций и время по фазам для одного прогона сортировки.
+# Сравнения, обмены и записи считаются по событиям генератора, объём
+# вспомогательной памяти - по событиям AUX. Время делится на фазы:
+# generate (генератор + буфер), render (обновление художников),
+# draw и blit (отрисовка холста). Статистику можно читать на ходу
+# (snapshot) и сохранить в конце (dump). Фазы и отрисовка холста попадают
+# и в профиль кадров (profiler.py), если визуализатор его включил.
+import json
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from events import AUX, COMPARE, SWAP, WRITE
+from profiler import NULL_PROFILER
+
+
+class SortStats:
+    def __init__(self, name=""):
+        self.name = name
+        self.comparisons = 0
+        self.swaps = 0
+        self.writes = 0
+        self.aux_memory = 0
+        self.peak_aux_memory = 0
+        self.phases = {}  # фаза -> [секунды, вызовы]
+        self.started = time.perf_counter()
+        self.finished = None
+        self.profiler = NULL_PROFILER  # profiler.FrameProfiler - фазы ещё и вложенными отрезками
+
+    def count(self, event):
+        op = event[0]
+        if op == COMPARE:
+            self.comparisons += 1
+        elif op == SWAP:
+            self.swaps += 1
+        elif op == WRITE:
+            self.writes += 1
+        elif op == AUX:
+            self.aux_memory = event[1]
+            if self.aux_memory > self.peak_aux_memory:
+                self.peak_aux_memory = self.aux_memory
+
+    def count_all(self, events):
+        # Пропускает события через счётчики, не меняя поток
+        for event in events:
+            self.count(event)
+            yield event
+
+    def count_block(self, records):
+        # То же для блока записанных событий (tracefile.EVENT_DTYPE), без цикла Python
+        ops = records["op"]
+        counts = np.bincount(ops, minlength=AUX + 1)
+        self.comparisons += int(counts[COMPARE])
+        self.swaps += int(counts[SWAP])
+        self.writes += int(counts[WRITE])
+        aux = records["a"][ops == AUX]
+        if len(aux):
+            self.aux_memory = int(aux[-1])
+            self.peak_aux_memory = max(self.peak_aux_memory, int(aux.max()))
+
+    def add_time(self, phase, seconds):
+        entry = self.phases.setdefault(phase, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            with self.profiler.span(name):
+                yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def timed(self, name, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with self.profiler.span(name):
+                    return func(*args, **kwargs)
+            finally:
+                self.add_time(name, time.perf_counter() - start)
+        return wrapper
+
+    def instrument_canvas(self, canvas):
+        # Полная отрисовка и блиттинг идут вне update_animation - оборачиваем сам холст
+        canvas.draw = self.timed("draw", canvas.draw)
+        canvas.blit = self.timed("blit", canvas.blit)
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    @property
+    def wall_time(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def snapshot(self):
+        return {
+            "name": self.name,
+            "comparisons": self.comparisons,
+            "swaps": self.swaps,
+            "writes": self.writes,
+            "aux_memory": self.aux_memory,
+            "peak_aux_memory": self.peak_aux_memory,
+            "wall_time": self.wall_time,
+            "phases": {
+                phase: {"seconds": seconds, "calls": calls}
+                for phase, (seconds, calls) in self.phases.items()
+            },
+        }
+
+    def summary(self):
+        phases = ", ".join(f"{phase} {seconds:.3f} с" for phase, (seconds, _) in self.phases.items())
+        text = (f"сравнений: {self.comparisons}, обменов: {self.swaps}, записей: {self.writes}, "
+                f"доп. память: {self.peak_aux_memory}, время: {self.wall_time:.3f} с")
+        return f"{text} ({phases})" if phases else text
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
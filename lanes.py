@@ -0,0 +1,44 @@
+# Владение позициями массива в параллельных алгоритмах (события LANE).
+# Событие (LANE, start, w) отдаёт позиции start.. воркеру w; отрезки выдаются
+# по возрастанию, так что следующий отрезок обрезает предыдущий. Визуализатор
+# красит столбцы воркеров цветами полос, остальные - цветами своих значений.
+import numpy as np
+
+from events import LANE
+
+# Палитра tab10 без серого: соседние воркеры хорошо различимы
+LANE_COLORS = np.array([
+    (0.122, 0.467, 0.706, 1.0),
+    (1.000, 0.498, 0.055, 1.0),
+    (0.173, 0.627, 0.173, 1.0),
+    (0.839, 0.153, 0.157, 1.0),
+    (0.580, 0.404, 0.741, 1.0),
+    (0.549, 0.337, 0.294, 1.0),
+    (0.890, 0.467, 0.761, 1.0),
+    (0.737, 0.741, 0.133, 1.0),
+    (0.090, 0.745, 0.812, 1.0),
+])
+
+
+class LaneMap:
+    def __init__(self, n):
+        self.owner = np.full(n, -1, dtype=np.int64)
+        self.changed = False
+
+    def apply(self, event):
+        _, start, worker = event
+        self.owner[start:] = worker
+        self.changed = True
+
+    def apply_records(self, records):
+        # То же для блока записанных событий (tracefile.EVENT_DTYPE)
+        lanes = records[records["op"] == LANE]
+        for start, worker in zip(lanes["a"].tolist(), lanes["b"].tolist()):
+            self.apply((LANE, start, int(worker)))
+
+    def paint(self, colors):
+        # colors - цвета кадра (RGBA, по одному на позиции), полосы рисуются поверх на месте
+        self.changed = False
+        owned = self.owner >= 0
+        colors[owned] = LANE_COLORS[self.owner[owned] % len(LANE_COLORS)]
+        return colors
@@ -1,25 +1,51 @@
-import matplotlib
-matplotlib.use('Qt5Agg')
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
-import random
 from itertools import zip_longest
+from algorithms import SortAlgorithms, check_size, get_algorithm
+from events import advance
+from gui import pyplot, show
+from distributions import make_input, value_limits
+from tracecache import cached_events
+from history import History, history_budget
+from pacing import estimate_changes
+from profiler import make_profiler
+from palette import Highlights, ValuePalette
+
+# Алгоритмы гонки по панелям, слева направо и сверху вниз
+RACE = ["quicksort", "bubblesort", "mergesort", "insertionsort"]
+
 
 class SortingVisualizer:
-    def __init__(self, n=20):
+    def __init__(self, n=20, update_every=1, parallel=False, algorithms=None,
+                 distribution="random", seed=0, duration=20.0):
+        self.names = list(algorithms or RACE)  # четыре алгоритма из реестра, по одному на панель
+        if len(self.names) != 4:
+            raise ValueError("Для гонки нужно ровно 4 алгоритма")
+        for name in self.names:
+            check_size(name, n)
         self.n = n
-        self.arr = list(range(1, n+1))
-        random.shuffle(self.arr)
+        self.parallel = parallel  # каждый алгоритм в своём процессе, GUI читает снимки
+        self.duration = duration  # параллельная гонка: за столько секунд закончит самый медленный
+        self.update_every = update_every  # изменений массива на одну перерисовку
+        # Фиксированный seed - одинаковый вход при каждом запуске, трассы берутся из кэша;
+        # seed=None - новая перестановка без кэша
+        self.seed = seed
+        self.distribution = distribution
+        self.arr = make_input(distribution, n, seed)
+        self.limits = value_limits(self.arr)
         self.setup_figure()
         self.setup_algorithms()
         self.completed = [False] * 4
-        self.current_frames = [self.arr.copy() for _ in range(4)]
+        # Кадры - массивы NumPy: история переводит их между шагами блоками
+        self.current_frames = [np.array(self.arr, dtype=float) for _ in range(4)]
         self.iterations = [0] * 4
+        self.positions = [0] * 4  # сколько изменений показано на панели
         self.final_messages = [""] * 4
+        self.paused = False
+        self.reported = False
+        self.profiler = make_profiler("Сравнение алгоритмов (3D)")  # VISUALSORT_PROFILE
 
     def setup_figure(self):
+        plt = pyplot()
         self.fig = plt.figure(figsize=(14, 10), dpi=100)
         self.fig.suptitle('Сравнение алгоритмов сортировки (3D)', fontsize=16)
         self.axes = [
@@ -28,168 +54,160 @@ class SortingVisualizer:
             self.fig.add_subplot(223, projection='3d'),
             self.fig.add_subplot(224, projection='3d')
         ]
-        self.titles = ["QuickSort > Быстрая", "BubbleSort > Пузырьковая", "MergeSort > Слиянием", "InsertionSort > Вставками"]
-        self.colors = plt.cm.viridis(np.linspace(0, 1, self.n))
-        self.z = np.zeros(self.n)
-        self.dx = self.dy = np.ones(self.n)
+        self.titles = [f"{name} > {get_algorithm(name).title}" for name in self.names]
+        # Цвет - по значению элемента: элемент уносит его с собой при перестановках
+        self.palette = ValuePalette(self.arr)
+        self.highlights = Highlights()
 
     def setup_algorithms(self):
-        self.generators = [
-            self.quicksort_gen(self.arr.copy()),
-            self.bubblesort_gen(self.arr.copy()),
-            self.mergesort_gen(self.arr.copy()),
-            self.insertionsort_gen(self.arr.copy())
-        ]
+        if self.parallel:
+            from producers import ProcessProducer
+            # Общий темп для всех воркеров: иначе на малых n они заканчивают за пару кадров.
+            # Самый медленный по оценке укладывается в duration, остальные финишируют раньше
+            max_rate = max(estimate_changes(name, self.n) for name in self.names) / self.duration
+            self.producers = [ProcessProducer(name, self.arr, max_rate=max_rate) for name in self.names]
+            for producer in self.producers:
+                producer.start()
+            return
+        self.runs = [SortAlgorithms(name) for name in self.names]
+        self.generators = [cached_events(run, self.arr, self.seed, self.distribution) for run in self.runs]
+        # История на панель для шагов назад; общий бюджет делится поровну
+        budget = history_budget() // 4
+        self.histories = [History(self.arr, estimate_changes(name, self.n), budget) for name in self.names]
 
-    def quicksort_gen(self, arr):
-        stack = [(0, len(arr)-1)]
-        iterations = 0
-        while stack:
-            l, r = stack.pop()
-            if l >= r:
-                continue
-                
-            x = arr[l]
-            j = l
-            for i in range(l+1, r+1):
-                if arr[i] <= x:
-                    j += 1
-                    arr[j], arr[i] = arr[i], arr[j]
-                    iterations += 1
-                    yield arr.copy()
-            arr[l], arr[j] = arr[j], arr[l]
-            iterations += 1
-            yield arr.copy()
-            
-            stack.append((j+1, r))
-            stack.append((l, j-1))
-        self.final_messages[0] = f"Готово! Итераций: {iterations}"
-
-    def bubblesort_gen(self, arr):
-        n = len(arr)
-        iterations = 0
-        for i in range(n):
-            swapped = False
-            for j in range(0, n-i-1):
-                if arr[j] > arr[j+1]:
-                    arr[j], arr[j+1] = arr[j+1], arr[j]
-                    swapped = True
-                    iterations += 1
-                    yield arr.copy()
-            if not swapped:
-                break
-        self.final_messages[1] = f"Готово! Итераций: {iterations}"
-
-    def mergesort_gen(self, arr):
-        current_size = 1
-        n = len(arr)
-        temp_arr = arr.copy()
-        iterations = 0
-        
-        while current_size < n:
-            for left in range(0, n, 2*current_size):
-                mid = min(left + current_size - 1, n-1)
-                right = min(left + 2*current_size - 1, n-1)
-                
-                i, j, k = left, mid+1, left
-                while i <= mid and j <= right:
-                    if arr[i] <= arr[j]:
-                        temp_arr[k] = arr[i]
-                        i += 1
-                    else:
-                        temp_arr[k] = arr[j]
-                        j += 1
-                    k += 1
-                    iterations += 1
-                    yield arr.copy()
-                
-                while i <= mid:
-                    temp_arr[k] = arr[i]
-                    i += 1
-                    k += 1
-                    iterations += 1
-                    yield arr.copy()
-                
-                while j <= right:
-                    temp_arr[k] = arr[j]
-                    j += 1
-                    k += 1
-                    iterations += 1
-                    yield arr.copy()
-                
-                for x in range(left, right+1):
-                    arr[x] = temp_arr[x]
-                    iterations += 1
-                    yield arr.copy()
-            
-            current_size *= 2
-        self.final_messages[2] = f"Готово! Итераций: {iterations}"
-
-    def insertionsort_gen(self, arr):
-        iterations = 0
-        for i in range(1, len(arr)):
-            key = arr[i]
-            j = i-1
-            while j >= 0 and arr[j] > key:
-                arr[j+1] = arr[j]
-                j -= 1
-                iterations += 1
-                yield arr.copy()
-            arr[j+1] = key
-            iterations += 1
-            yield arr.copy()
-        self.final_messages[3] = f"Готово! Итераций: {iterations}"
+    def close_producers(self, _=None):
+        for producer in self.producers:
+            producer.close()
 
     def init_animation(self):
+        from bars3d import Bars3D
+        self.bars = []
         for ax, title, frame in zip(self.axes, self.titles, self.current_frames):
             ax.clear()
-            dz = np.array(frame)
-            ax.bar3d(range(self.n), self.z, self.z, self.dx, self.dy, dz, 
-                    color=self.colors, shade=True, alpha=0.8)
+            self.bars.append(Bars3D(ax, frame, self.palette.colors(frame), alpha=0.8))
             ax.set_title(title, y=1.02)
             ax.set_xlim(0, self.n)
             ax.set_ylim(0, 1)
-            ax.set_zlim(0, self.n+1)
+            ax.set_zlim(*self.limits)
             ax.set_xticks([])
             ax.set_yticks([])
-            ax.set_zticks(range(0, self.n+1, max(1, self.n//5)))
+            ax.set_zticks(np.linspace(0, self.limits[1], 6).round())
         return self.axes
 
+    def step(self, i):
+        # Изменённые за кадр индексы; None - алгоритм завершён
+        if self.parallel:
+            producer = self.producers[i]
+            dirty = producer.poll(self.current_frames[i])
+            self.iterations[i] = producer.changes
+            self.final_messages[i] = producer.final_message
+            return dirty
+        history = self.histories[i]
+        if self.positions[i] < len(history):
+            # После перемотки назад кадры берутся из истории, пока не догонят генератор
+            start = self.positions[i]
+            dirty, _ = history.seek(self.current_frames[i], start, start + self.update_every)
+            self.positions[i] = history.clamp(start + self.update_every)
+        else:
+            dirty = set()
+            changes = advance(self.generators[i], self.current_frames[i], self.update_every, dirty,
+                              history=history, highlights=self.highlights)
+            if not changes:
+                self.final_messages[i] = self.runs[i].final_message
+                return None
+            self.positions[i] += changes
+        self.iterations[i] += 1
+        return dirty
+
+    def recolor(self, i, dirty=()):
+        # Цвета панели - выборка из таблицы по значениям и подсветка изменённых за кадр
+        # позиций, одним set_facecolor
+        colors = self.palette.colors(self.current_frames[i])
+        self.highlights.mark(dirty)
+        colors = self.highlights.overlay(colors)
+        self.bars[i].set_colors(colors)
+
+    # ---------- Перемотка ----------
+    def seek(self, step):
+        # Все панели - к состоянию после step изменений (или к ближайшему доступному)
+        for i, history in enumerate(self.histories):
+            dirty, _ = history.seek(self.current_frames[i], self.positions[i], step)
+            self.positions[i] = history.clamp(step)
+            self.iterations[i] = -(-self.positions[i] // self.update_every)
+            self.completed[i] = self.completed[i] and self.positions[i] == len(history)
+            self.bars[i].set_heights(dirty, self.current_frames[i])
+            self.recolor(i)
+            self.axes[i].set_title(f"{self.titles[i]} (шаг: {self.positions[i]} из {len(history)})", y=1.02)
+        self.fig.canvas.draw_idle()
+
+    def on_key(self, event):
+        if event.key == " ":
+            self.paused = not self.paused
+            self.anim.event_source.start()
+        if self.parallel:
+            return
+        step = max(self.positions)
+        recorded = max(len(history) for history in self.histories)
+        jump = max(1, recorded // 20)
+        if event.key == "left":
+            self.paused = True
+            self.seek(step - self.update_every)
+        elif event.key == "right":
+            self.paused = True
+            self.advance_all()
+            self.fig.canvas.draw_idle()
+        elif event.key == "shift+left":
+            self.seek(step - jump)
+        elif event.key == "shift+right":
+            self.seek(step + jump)
+        elif event.key == "home":
+            self.seek(0)
+        elif event.key == "end":
+            self.seek(recorded)
+        else:
+            return
+        # После завершения таймер остановлен - перемотка назад продолжает показ
+        self.anim.event_source.start()
+
+    # ---------- Анимация ----------
     def update_animation(self, _):
+        if not self.paused:
+            with self.profiler.span("frame"):
+                self.advance_all()
+        return self.axes
+
+    def advance_all(self):
         any_active = False
         
         for i in range(4):
             if not self.completed[i]:
-                try:
-                    self.current_frames[i] = next(self.generators[i])
-                    self.iterations[i] += 1
-                    self.axes[i].clear()
-                    dz = np.array(self.current_frames[i])
-                    self.axes[i].bar3d(range(self.n), self.z, self.z, 
-                                     self.dx, self.dy, dz, 
-                                     color=self.colors, shade=True, alpha=0.8)
-                    title = f"{self.titles[i]} (итерация: {self.iterations[i]})"
-                    self.axes[i].set_title(title, y=1.02)
-                    self.axes[i].set_xlim(0, self.n)
-                    self.axes[i].set_ylim(0, 1)
-                    self.axes[i].set_zlim(0, self.n+1)
-                    self.axes[i].set_xticks([])
-                    self.axes[i].set_yticks([])
-                    self.axes[i].set_zticks(range(0, self.n+1, max(1, self.n//5)))
-                    any_active = True
-                except StopIteration:
-                    self.completed[i] = True
-                    self.axes[i].set_title(f"{self.titles[i]} - {self.final_messages[i]}", y=1.02)
+                with self.profiler.span(self.names[i]):
+                    with self.profiler.span("generate"):
+                        dirty = self.step(i)
+                    if dirty is not None:
+                        with self.profiler.span("bars"):
+                            self.bars[i].set_heights(dirty, self.current_frames[i])
+                        with self.profiler.span("colors"):
+                            self.recolor(i, dirty)
+                        title = f"{self.titles[i]} (итерация: {self.iterations[i]})"
+                        self.axes[i].set_title(title, y=1.02)
+                        any_active = True
+                    else:
+                        self.completed[i] = True
+                        self.recolor(i)
+                        self.axes[i].set_title(f"{self.titles[i]} - {self.final_messages[i]}", y=1.02)
         
         if not any_active:
             self.anim.event_source.stop()
+        if not any_active and not self.reported:
+            self.reported = True
             print("\nВсе алгоритмы завершены!")
             for i, title in enumerate(self.titles):
                 print(f"{title}: {self.final_messages[i]}")
-        
-        return self.axes
 
     def visualize(self):
+        from matplotlib.animation import FuncAnimation
+        plt = pyplot()
         self.anim = FuncAnimation(
             self.fig,
             self.update_animation,
@@ -199,9 +217,16 @@ class SortingVisualizer:
             cache_frame_data=False,
             repeat=False
         )
+        if self.parallel:
+            self.fig.canvas.mpl_connect("close_event", self.close_producers)
+        # Пробел - пауза, ← / → - на кадр, Shift+← / Shift+→ - на 5%, Home / End
+        self.fig.canvas.mpl_connect("key_press_event", self.on_key)
+        self.profiler.instrument_canvas(self.fig.canvas)
         plt.tight_layout()
         plt.subplots_adjust(top=0.9)
-        plt.show()
+        with self.profiler.span("visualize"):
+            show()
+        self.profiler.dump()
 
 if __name__ == "__main__":
     # n = int(input("Введите размер массива (рекомендуется 10-30): "))
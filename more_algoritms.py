@@ -1,242 +1,322 @@
-import matplotlib
-matplotlib.use('Qt5Agg')  # или 'TkAgg' при необходимости
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+import time
 import numpy as np
-import random
+from events import advance
+from bars import make_bars, set_bar_heights
+from pacing import FramePacer, estimate_changes
+from instrumentation import SortStats
+from profiler import make_profiler
+from gui import has_display, pyplot, show
+from distributions import DISTRIBUTIONS, make_input, value_limits
+from tracecache import cached_events, find_cached
+from history import History
+from lanes import LaneMap
+from palette import Highlights, ValuePalette
+from algorithms import SortAlgorithms, algorithm_names, check_size, get_algorithm
 
-class SortingVisualizer:
-    def __init__(self, algorithm_name, array_size, is_3d=False, update_every=10):
+class SortingVisualizer(SortAlgorithms):
+    def __init__(self, algorithm_name, array_size, is_3d=False, update_every=None, trace=None,
+                 fps=60, duration=20.0, stats_path=None, distribution="random", seed=0, terminal=False):
+        super().__init__(algorithm_name)
         self.n = array_size
-        self.update_every = update_every
-        self.algorithm_name = algorithm_name
-        self.arr = list(range(1, self.n + 1))
-        random.shuffle(self.arr)
+        self.stats = SortStats(algorithm_name)  # счётчики и время по фазам, доступны на ходу
+        self.stats_path = stats_path  # куда сохранить статистику в конце (JSON)
+        # Профиль кадров (VISUALSORT_PROFILE): фазы SortStats становятся его отрезками
+        self.profiler = make_profiler(algorithm_name)
+        self.stats.profiler = self.profiler
+        self.update_every = update_every  # None - подбирается пейсером под fps и duration
+        self.trace = trace  # tracefile.Trace: воспроизведение записанного прогона с перемоткой
+        if self.trace is None:
+            # Прогон с тем же seed уже записан - проигрывается из кэша блоками, с перемоткой
+            self.trace = find_cached(algorithm_name, array_size, seed, distribution)
+        if self.trace is not None:
+            self.arr = self.trace.state_at(0)
+            self.final_message = self.trace.metadata.get("final_message", "")
+            self.trace_step = 0  # сколько событий трассы уже применено к кадру
+            self.trace_counted = 0  # до какого события трасса учтена в stats
+            self.change_steps = self.trace.change_steps()
+        else:
+            check_size(algorithm_name, self.n)
+            self.arr = make_input(distribution, self.n, seed)  # форма входа из distributions.py
+            # Трасса пишется в кэш по ходу сортировки; seed=None - без кэша
+            self.generator = cached_events(self, self.arr, seed, distribution)
+        self.limits = value_limits(self.arr)
+        # Пейсер считает изменения массива - в трассе это шаги изменений, а не все события,
+        # иначе воспроизведение из кэша шло бы быстрее живого прогона
+        total = len(self.change_steps) if self.trace is not None else estimate_changes(algorithm_name, self.n)
+        if self.trace is None:
+            # Живой прогон: ключевые кадры + изменения в памяти для шагов назад
+            self.history = History(self.arr, total)
+            self.view_step = 0  # сколько изменений из истории показано на кадре
+        self.pacer = FramePacer(total, fps=fps, duration=duration)
         self.is_3d = is_3d
-        self.colors = plt.cm.viridis(np.linspace(0, 1, self.n))
-        self.generator = self.get_generator(self.arr.copy())
-        self.current_frame = self.arr.copy()
+        self.terminal = terminal  # рисовать в терминале вместо окна matplotlib
+        # Трасса и история проигрываются блоками через replay - кадр всегда массив NumPy
+        self.current_frame = np.array(self.arr, dtype=float)
         self.iteration = 0
         self.completed = False
-        self.final_message = ""
+        self.reported = False
+        self.paused = False
+        self.lanes = LaneMap(self.n)  # владельцы позиций в параллельных алгоритмах
+        self.highlights = None  # позиции, затронутые с прошлого кадра; в терминале не рисуются
+        if self.terminal:
+            return
 
+        plt = pyplot()
+        # Цвет - по значению элемента, а не по позиции: элемент уносит его с собой
+        self.palette = ValuePalette(self.arr)
+        self.highlights = Highlights()
         self.fig = plt.figure(figsize=(12, 6))
         if self.is_3d:
             from mpl_toolkits.mplot3d import Axes3D
             self.ax = self.fig.add_subplot(111, projection='3d')
-            self.z = np.zeros(self.n)
-            self.dx = self.dy = np.ones(self.n)
         else:
             self.ax = self.fig.add_subplot(111)
             self.bar_container = None
 
-    def get_generator(self, arr):
-        if self.algorithm_name == "quicksort":
-            return self.quicksort_gen(arr)
-        elif self.algorithm_name == "bubblesort":
-            return self.bubblesort_gen(arr)
-        elif self.algorithm_name == "mergesort":
-            return self.mergesort_gen(arr)
-        elif self.algorithm_name == "insertionsort":
-            return self.insertionsort_gen(arr)
-        elif self.algorithm_name == "selectionsort":
-            return self.selectionsort_gen(arr)
-        elif self.algorithm_name == "shellsort":
-            return self.shellsort_gen(arr)
+    # ---------- Трасса ----------
+    def trace_batch(self, changes):
+        # Следующие changes изменений трассы одним блоком; 0 - трасса закончилась
+        done = np.searchsorted(self.change_steps, self.trace_step, side="right")
+        last = min(done + changes, len(self.change_steps))
+        if last == done:
+            return 0, None
+        stop = int(self.change_steps[last - 1])
+        # После последнего изменения остаются только сравнения - учитываем и их
+        counted = len(self.trace) if last == len(self.change_steps) else stop
+        records = self.trace.records(self.trace_step, counted)
+        self.count_trace(counted)
+        self.lanes.apply_records(records)
+        if self.highlights is not None:
+            self.highlights.add_records(records)
+        dirty, _ = self.trace.replay(self.current_frame, self.trace_step, stop)
+        self.trace_step = stop
+        return last - done, dirty
+
+    def count_trace(self, stop):
+        # Каждое событие трассы учитывается в stats один раз: повтор после перемотки
+        # назад не считается, а пропущенное перемоткой вперёд досчитывается
+        if stop > self.trace_counted:
+            self.stats.count_block(self.trace.records(self.trace_counted, stop))
+            self.trace_counted = stop
+
+    # ---------- Перемотка ----------
+    def position(self):
+        # Текущий шаг и число доступных шагов: события трассы или изменения в истории
+        if self.trace is not None:
+            return self.trace_step, len(self.trace)
+        return self.view_step, len(self.history)
+
+    def seek(self, step):
+        if self.trace is not None:
+            step = max(0, min(step, len(self.trace)))
+            dirty, _ = self.trace.replay(self.current_frame, self.trace_step, step)
+            self.trace_step = step
+            self.count_trace(step)
         else:
-            raise ValueError("Неизвестный алгоритм")
-
-    # ---------- Алгоритмы ----------
-    def quicksort_gen(self, arr):
-        stack = [(0, len(arr)-1)]
-        iterations = 0
-        while stack:
-            l, r = stack.pop()
-            if l >= r:
-                continue
-            pivot = arr[l]
-            j = l
-            for i in range(l + 1, r + 1):
-                if arr[i] <= pivot:
-                    j += 1
-                    arr[j], arr[i] = arr[i], arr[j]
-                    iterations += 1
-                    if iterations % self.update_every == 0:
-                        yield arr.copy()
-            arr[l], arr[j] = arr[j], arr[l]
-            iterations += 1
-            yield arr.copy()
-            stack.append((j + 1, r))
-            stack.append((l, j - 1))
-        self.final_message = f"Готово! Итераций: {iterations}"
-
-    def bubblesort_gen(self, arr):
-        iterations = 0
-        for i in range(len(arr)):
-            for j in range(len(arr) - i - 1):
-                if arr[j] > arr[j + 1]:
-                    arr[j], arr[j + 1] = arr[j + 1], arr[j]
-                    iterations += 1
-                    if iterations % self.update_every == 0:
-                        yield arr.copy()
-        self.final_message = f"Готово! Итераций: {iterations}"
-
-    def mergesort_gen(self, arr):
-        current_size = 1
-        n = len(arr)
-        temp = arr.copy()
-        iterations = 0
-
-        while current_size < n:
-            for left in range(0, n, 2 * current_size):
-                mid = min(left + current_size - 1, n - 1)
-                right = min(left + 2 * current_size - 1, n - 1)
-                i, j, k = left, mid + 1, left
-                while i <= mid and j <= right:
-                    if arr[i] <= arr[j]:
-                        temp[k] = arr[i]
-                        i += 1
-                    else:
-                        temp[k] = arr[j]
-                        j += 1
-                    k += 1
-                    iterations += 1
-                    if iterations % self.update_every == 0:
-                        yield arr.copy()
-                while i <= mid:
-                    temp[k] = arr[i]
-                    i += 1
-                    k += 1
-                while j <= right:
-                    temp[k] = arr[j]
-                    j += 1
-                    k += 1
-                for x in range(left, right + 1):
-                    arr[x] = temp[x]
-                    iterations += 1
-                    if iterations % self.update_every == 0:
-                        yield arr.copy()
-            current_size *= 2
-        self.final_message = f"Готово! Итераций: {iterations}"
-
-    def insertionsort_gen(self, arr):
-        iterations = 0
-        for i in range(1, len(arr)):
-            key = arr[i]
-            j = i - 1
-            while j >= 0 and arr[j] > key:
-                arr[j + 1] = arr[j]
-                j -= 1
-                iterations += 1
-                if iterations % self.update_every == 0:
-                    yield arr.copy()
-            arr[j + 1] = key
-            iterations += 1
-            yield arr.copy()
-        self.final_message = f"Готово! Итераций: {iterations}"
-        
-    def selectionsort_gen(self, arr):
-        iterations = 0
-        for i in range(len(arr)):
-            min_idx = i
-            for j in range(i + 1, len(arr)):
-                if arr[j] < arr[min_idx]:
-                    min_idx = j
-                iterations += 1
-                if iterations % self.update_every == 0:
-                    yield arr.copy()
-            arr[i], arr[min_idx] = arr[min_idx], arr[i]
-            yield arr.copy()
-        self.final_message = f"Готово! Итераций: {iterations}"
-
-    def shellsort_gen(self, arr):
-        n = len(arr)
-        gap = n // 2
-        iterations = 0
-        while gap > 0:
-            for i in range(gap, n):
-                temp = arr[i]
-                j = i
-                while j >= gap and arr[j - gap] > temp:
-                    arr[j] = arr[j - gap]
-                    j -= gap
-                    iterations += 1
-                    if iterations % self.update_every == 0:
-                        yield arr.copy()
-                arr[j] = temp
-                yield arr.copy()
-            gap //= 2
-        self.final_message = f"Готово! Итераций: {iterations}"
+            dirty, _ = self.history.seek(self.current_frame, self.view_step, step)
+            self.view_step = self.history.clamp(step)
+        self.completed = False
+        self.show_step(dirty)
+
+    def show_step(self, dirty):
+        step, total = self.position()
+        self.draw_bars(dirty)
+        self.ax.set_title(f"{self.algorithm_name} | Шаг {step} из {total}")
+        self.fig.canvas.draw_idle()
 
+    def step_back(self):
+        if self.trace is None:
+            self.seek(self.view_step - 1)
+            return
+        # Состояние на одно изменение массива раньше
+        done = np.searchsorted(self.change_steps, self.trace_step, side="right")
+        self.seek(int(self.change_steps[done - 2]) if done >= 2 else 0)
+
+    def step_forward(self):
+        if self.trace is not None:
+            done = np.searchsorted(self.change_steps, self.trace_step, side="right")
+            self.seek(int(self.change_steps[done]) if done < len(self.change_steps) else len(self.trace))
+        elif self.view_step < len(self.history):
+            self.seek(self.view_step + 1)
+        else:
+            # Конец истории - следующее изменение берётся у генератора
+            dirty = set()
+            self.view_step += advance(self.generator, self.current_frame, 1, dirty, self.stats, self.history,
+                                      self.lanes, self.highlights)
+            self.show_step(dirty)
+
+    def on_key(self, event):
+        step, total = self.position()
+        # 5% прогона: позиция в трассе считается событиями, а пейсер - изменениями
+        jump = max(1, (total if self.trace is not None else self.pacer.total_steps) // 20)
+        if event.key == "i":
+            print(f"{self.algorithm_name}: {self.stats.summary()}")
+        elif event.key == " ":
+            self.paused = not self.paused
+        elif event.key == "left":
+            self.paused = True
+            self.step_back()
+        elif event.key == "right":
+            self.paused = True
+            self.step_forward()
+        elif event.key == "shift+left":
+            self.seek(step - jump)
+        elif event.key == "shift+right":
+            self.seek(step + jump)
+        elif event.key == "home":
+            self.seek(0)
+        elif event.key == "end":
+            self.seek(total)
 
     # ---------- Анимация ----------
     def init_animation(self):
         if self.is_3d:
             self.ax.set_xlim(0, self.n)
             self.ax.set_ylim(0, 1)
-            self.ax.set_zlim(0, self.n + 1)
+            self.ax.set_zlim(*self.limits)
             self.ax.set_xticks([]); self.ax.set_yticks([]); self.ax.set_zticks([])
-            bars = self.ax.bar3d(range(self.n), self.z, self.z, self.dx, self.dy, self.current_frame, color=self.colors)
+            from bars3d import Bars3D
+            self.bars3d = Bars3D(self.ax, self.current_frame, self.palette.colors(self.current_frame))
+            bars = self.bars3d.collection
             self.bar_container = bars
             return bars
         else:
             self.ax.set_xlim(-1, self.n)
-            self.ax.set_ylim(0, self.n + 1)
+            self.ax.set_ylim(*self.limits)
             self.ax.set_xticks([]); self.ax.set_yticks([])
-            bars = self.ax.bar(range(self.n), self.current_frame, color=self.colors, width=1.0)
+            bars = make_bars(self.ax, self.current_frame, self.palette.colors(self.current_frame), width=1.0)
             self.bar_container = bars
             return bars
 
-    def update_animation(self, _):
-        if not self.completed:
-            try:
-                self.current_frame = next(self.generator)
-                self.iteration += 1
+    def draw_bars(self, dirty):
+        with self.profiler.span("bars"):
+            if self.is_3d:
+                self.bars3d.set_heights(dirty, self.current_frame)
+            else:
+                set_bar_heights(self.bar_container, dirty, self.current_frame)
+        if len(dirty) or self.highlights or self.lanes.changed:
+            # Цвета кадра: выборка из таблицы по значениям, полосы воркеров параллельных
+            # алгоритмов и подсветка затронутых позиций - и один set_facecolor
+            with self.profiler.span("colors"):
+                colors = self.lanes.paint(self.palette.colors(self.current_frame))
+                self.highlights.overlay(colors)
                 if self.is_3d:
-                    self.ax.cla()
-                    self.ax.set_xlim(0, self.n)
-                    self.ax.set_ylim(0, 1)
-                    self.ax.set_zlim(0, self.n + 1)
-                    self.ax.set_xticks([]); self.ax.set_yticks([]); self.ax.set_zticks([])
-                    self.ax.bar3d(range(self.n), self.z, self.z, self.dx, self.dy, self.current_frame, color=self.colors)
-                    self.ax.set_title(f"{self.algorithm_name} | Итерация {self.iteration}")
+                    self.bars3d.set_colors(colors)
+                else:
+                    self.bar_container.set_facecolor(colors)
+
+    def history_batch(self, changes):
+        # После перемотки назад кадры берутся из истории, пока не догонят генератор
+        if self.view_step < len(self.history):
+            start = self.view_step
+            dirty, _ = self.history.seek(self.current_frame, start, start + changes)
+            self.view_step = self.history.clamp(start + changes)
+            if self.highlights is not None:
+                self.highlights.mark(dirty)
+            return self.view_step - start, dirty
+        dirty = set()
+        changes = advance(self.generator, self.current_frame, changes, dirty, self.stats, self.history,
+                          self.lanes, self.highlights)
+        self.view_step += changes
+        return changes, dirty
+
+    def next_frame(self):
+        # Изменения следующего кадра: (число изменений, изменённые индексы)
+        batch = self.update_every or self.pacer.next_batch()
+        with self.stats.phase("generate"):
+            if self.trace is not None:
+                changes, dirty = self.trace_batch(batch)
+            else:
+                changes, dirty = self.history_batch(batch)
+        if changes:
+            self.pacer.done(changes)
+            self.iteration += 1
+        return changes, dirty
+
+    def finish(self):
+        self.completed = True
+        if self.reported:
+            return
+        self.reported = True
+        self.stats.finish()
+        print(f"{self.algorithm_name}: {self.stats.summary()}")
+        if self.stats_path:
+            self.stats.dump(self.stats_path)
+
+    def update_animation(self, _):
+        if not self.completed and not self.paused:
+            with self.profiler.span("frame"):
+                changes, dirty = self.next_frame()
+                if changes:
+                    with self.stats.phase("render"):
+                        self.draw_bars(dirty)
+                        self.ax.set_title(f"{self.algorithm_name} | Итерация {self.iteration}")
                 else:
-                    for bar, height in zip(self.bar_container, self.current_frame):
-                        bar.set_height(height)
-                    self.ax.set_title(f"{self.algorithm_name} | Итерация {self.iteration}")
-            except StopIteration:
-                self.completed = True
-                self.ax.set_title(f"{self.algorithm_name} | {self.final_message}")
+                    self.ax.set_title(f"{self.algorithm_name} | {self.final_message}")
+                    self.finish()
         return self.bar_container
 
+    # ---------- Терминал ----------
+    def visualize_terminal(self):
+        # Тот же темп и те же пакеты изменений, что в окне; Ctrl+C - остановить
+        from terminal import TerminalRenderer
+        renderer = TerminalRenderer(self.current_frame, self.limits)
+        frame_time = 1.0 / self.pacer.fps
+        try:
+            while True:
+                started = time.perf_counter()
+                with self.profiler.span("frame"):
+                    changes, dirty = self.next_frame()
+                    if not changes:
+                        renderer.update([], self.current_frame, f"{self.algorithm_name} | {self.final_message}")
+                        break
+                    with self.stats.phase("render"):
+                        step, _ = self.position()
+                        renderer.update(dirty, self.current_frame,
+                                        f"{self.algorithm_name} | Итерация {self.iteration} | Шаг {step}")
+                time.sleep(max(0.0, frame_time - (time.perf_counter() - started)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            renderer.close()
+        self.finish()
+
     def visualize(self):
+        # Весь показ - один отрезок профиля, кадры и отрисовка вложены в него
+        with self.profiler.span("visualize"):
+            if self.terminal:
+                self.visualize_terminal()
+            else:
+                self.visualize_window()
+        self.profiler.dump()
+
+    def visualize_window(self):
+        from matplotlib.animation import FuncAnimation
+        plt = pyplot()
         self.anim = FuncAnimation(
             self.fig,
             self.update_animation,
             init_func=self.init_animation,
-            interval=1,
+            interval=self.pacer.interval,
             blit=False,
             cache_frame_data=False,
             repeat=False
         )
+        self.stats.instrument_canvas(self.fig.canvas)
+        # i - статистика в консоль, пробел - пауза, ← / → - на одно изменение,
+        # Shift+← / Shift+→ - на 5% прогона, Home / End - к началу и к концу
+        self.fig.canvas.mpl_connect("key_press_event", self.on_key)
         plt.tight_layout()
-        plt.show()
+        show()
 
 # ---------- Консольный интерфейс ----------
 def main():
-    algorithms = {
-    "1": "quicksort",
-    "2": "bubblesort",
-    "3": "mergesort",
-    "4": "insertionsort",
-    "5": "selectionsort",
-    "6": "shellsort",
-}
-
+    algorithms = {str(i): name for i, name in enumerate(algorithm_names(), 1)}
 
     print("Выберите алгоритм:")
     for k, v in algorithms.items():
-        print(f"{k}. {v.capitalize()}")
+        spec = get_algorithm(v)
+        print(f"{k}. {v.capitalize()} > {spec.title}, {spec.complexity}")
     alg_choice = input("Введите номер алгоритма: ").strip()
     algorithm = algorithms.get(alg_choice, "quicksort")
 
@@ -244,11 +324,39 @@ def main():
         size = int(input("Введите размер массива (например, 100): ").strip())
     except ValueError:
         size = 100
+    max_size = get_algorithm(algorithm).max_size
+    if size > max_size:
+        print(f"Для {algorithm} размер ограничен {max_size}")
+        size = max_size
+
+    distributions = {str(i): name for i, name in enumerate(DISTRIBUTIONS, 1)}
+    print("Выберите входные данные:")
+    for k, v in distributions.items():
+        print(f"{k}. {DISTRIBUTIONS[v][1]}")
+    distribution = distributions.get(input("Введите номер (по умолчанию 1): ").strip(), "random")
+    if distribution == "float_range" and algorithm.startswith("radixsort"):
+        print("Поразрядная сортировка работает только с целыми - взята случайная перестановка")
+        distribution = "random"
 
-    viz_choice = input("Выберите визуализацию: 1 - 2D, 2 - 3D: ").strip()
+    try:
+        seed = int(input("Seed входных данных (Enter - 0, тот же вход и трасса из кэша): ").strip())
+    except ValueError:
+        seed = 0
+
+    # Без дисплея окно не откроется - по умолчанию рисуем в терминале
+    default_view = "1" if has_display() else "3"
+    viz_choice = input(f"Выберите визуализацию: 1 - 2D, 2 - 3D, 3 - терминал (по умолчанию {default_view}): ").strip()
+    viz_choice = viz_choice or default_view
     is_3d = viz_choice == "2"
+    terminal = viz_choice == "3"
+
+    try:
+        duration = float(input("Длительность анимации в секундах (например, 20): ").strip())
+    except ValueError:
+        duration = 20.0
 
-    visualizer = SortingVisualizer(algorithm, size, is_3d=is_3d)
+    visualizer = SortingVisualizer(algorithm, size, is_3d=is_3d, duration=duration,
+                                   distribution=distribution, seed=seed, terminal=terminal)
     visualizer.visualize()
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+# Адаптивный темп анимации вместо ручных update_every / interval=1.
+# Пейсер измеряет реальный период кадра (вычисление + отрисовка + цикл событий)
+# и подбирает, сколько изменений массива применять за кадр, чтобы держать
+# целевой fps и уложить всю сортировку в целевую длительность.
+import time
+
+from algorithms import get_algorithm
+
+
+def estimate_changes(algorithm_name, n):
+    # Оценки числа изменений массива хранятся в реестре алгоритмов
+    if n < 2:
+        return 1
+    try:
+        estimate = get_algorithm(algorithm_name).estimate
+    except ValueError:
+        return n * n // 4
+    return max(1, int(estimate(n)))
+
+
+class FramePacer:
+    def __init__(self, total_steps, fps=60, duration=20.0, smoothing=0.2):
+        self.total_steps = max(1, total_steps)
+        self.fps = fps
+        self.duration = duration
+        self.smoothing = smoothing
+        self.frame_time = 1.0 / fps
+        self.steps_done = 0
+        self.last_tick = None
+
+    @property
+    def interval(self):
+        # Интервал таймера FuncAnimation в мс
+        return max(1, int(1000 / self.fps))
+
+    def next_batch(self):
+        now = time.perf_counter()
+        if self.last_tick is not None:
+            period = now - self.last_tick
+            self.frame_time += self.smoothing * (period - self.frame_time)
+        self.last_tick = now
+        # Оценка оказалась заниженной - растягиваем её, чтобы не тормозить в конце
+        if self.steps_done >= self.total_steps:
+            self.total_steps = int(self.steps_done * 1.25) + 1
+        steps_per_second = self.total_steps / self.duration
+        # Если кадр рисуется дольше бюджета, реальный fps ниже - пакет растёт
+        return max(1, round(steps_per_second * max(self.frame_time, 1.0 / self.fps)))
+
+    def done(self, steps):
+        self.steps_done += steps
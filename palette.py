@@ -0,0 +1,70 @@
+# Цвета столбцов по значению, а не по позиции: элемент несёт свой цвет, куда
+# бы его ни переставили. Таблица значение -> RGBA считается один раз, цвета
+# кадра - одна выборка NumPy по текущему массиву. Поверх неё - подсветка позиций,
+# которых коснулись события с прошлого кадра (сравнения, обмены, записи, опорный),
+# и всё уходит в коллекцию одним вызовом set_facecolor.
+import numpy as np
+
+from events import SWAP, WRITE, COMPARE, PIVOT
+
+LUT_SIZE = 1024
+
+# Порядок наложения: при нескольких событиях на позиции побеждает последнее в списке
+HIGHLIGHT_COLORS = {
+    COMPARE: (1.000, 0.843, 0.000, 1.0),
+    WRITE: (1.000, 0.498, 0.055, 1.0),
+    SWAP: (0.839, 0.153, 0.157, 1.0),
+    PIVOT: (0.890, 0.102, 0.890, 1.0),
+}
+
+
+class ValuePalette:
+    def __init__(self, values, cmap="viridis", size=LUT_SIZE):
+        from matplotlib import colormaps
+        values = np.asarray(values, dtype=float)
+        # Сортировка не меняет набор значений - пределы известны с первого кадра
+        self.low = float(values.min()) if len(values) else 0.0
+        high = float(values.max()) if len(values) else 1.0
+        self.scale = (size - 1) / (high - self.low) if high > self.low else 0.0
+        self.lut = colormaps[cmap](np.linspace(0, 1, size))
+
+    def colors(self, values):
+        index = ((np.asarray(values, dtype=float) - self.low) * self.scale + 0.5).astype(np.intp)
+        return self.lut[np.clip(index, 0, len(self.lut) - 1)]
+
+
+class Highlights:
+    # Позиции, которых коснулись события с прошлого кадра, по типу события
+    def __init__(self):
+        self.touched = {op: [] for op in HIGHLIGHT_COLORS}
+
+    def add(self, event):
+        op, a, b = event
+        if op == SWAP or op == COMPARE:
+            self.touched[op].extend((a, b))
+        elif op == WRITE or op == PIVOT:
+            self.touched[op].append(a)
+
+    def add_records(self, records):
+        # То же для блока записанных событий (tracefile.EVENT_DTYPE)
+        ops = records["op"]
+        for op in HIGHLIGHT_COLORS:
+            picked = records[ops == op]
+            self.touched[op].extend(picked["a"].tolist())
+            if op == SWAP or op == COMPARE:
+                self.touched[op].extend(picked["b"].astype(np.int64).tolist())
+
+    def mark(self, indices, op=WRITE):
+        # Изменения без событий (перемотка по истории) подсвечиваются как записи
+        self.touched[op].extend(indices)
+
+    def overlay(self, colors):
+        # Подсветка поверх цветов кадра на месте; после кадра список пуст
+        for op, indices in self.touched.items():
+            if indices:
+                colors[np.fromiter(indices, dtype=np.intp, count=len(indices))] = HIGHLIGHT_COLORS[op]
+                indices.clear()
+        return colors
+
+    def __bool__(self):
+        return any(self.touched.values())
@@ -0,0 +1,161 @@
+# Запуск алгоритмов сортировки в отдельных процессах.
+# Каждый воркер сортирует свою копию массива и периодически публикует
+# снимок состояния в кольцевой буфер multiprocessing.shared_memory.
+# GUI-процесс только читает последний готовый снимок, поэтому алгоритмы
+# и отрисовка не делят одно ядро.
+import multiprocessing
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Заголовок кольца: номер последнего слота, число изменений, флаг завершения
+LATEST, CHANGES, DONE = 0, 1, 2
+HEADER_FIELDS = 4
+
+
+class SnapshotRing:
+    def __init__(self, n, slots=3, name=None):
+        self.n = n
+        self.slots = slots
+        size = 8 * (HEADER_FIELDS + slots + slots * max(n, 1))
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = attach_shared_memory(name)
+        self.name = self.shm.name
+        buf = self.shm.buf
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=buf)
+        # Счётчики версий слотов (seqlock): нечётное значение - слот пишется
+        self.seqs = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=8 * HEADER_FIELDS)
+        self.data = np.ndarray((slots, n), dtype=np.float64, buffer=buf,
+                               offset=8 * (HEADER_FIELDS + slots))
+        if name is None:
+            self.header[:] = 0
+            self.header[LATEST] = -1
+            self.seqs[:] = 0
+
+    def publish(self, values, changes, done=False):
+        slot = (int(self.header[LATEST]) + 1) % self.slots
+        self.seqs[slot] += 1
+        self.data[slot] = values
+        self.seqs[slot] += 1
+        self.header[CHANGES] = changes
+        self.header[LATEST] = slot
+        if done:
+            self.header[DONE] = 1
+
+    def read(self, out):
+        # Копирует последний снимок в out. Возвращает (changes, done) или None,
+        # если снимков ещё нет
+        while True:
+            done = bool(self.header[DONE])
+            slot = int(self.header[LATEST])
+            if slot < 0:
+                return None
+            before = self.seqs[slot]
+            if before % 2:
+                continue
+            changes = int(self.header[CHANGES])
+            out[:] = self.data[slot]
+            if self.seqs[slot] == before:
+                return changes, done
+
+    def close(self):
+        # Представления numpy держат ссылки на буфер - освобождаем их до close()
+        self.header = self.seqs = self.data = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def attach_shared_memory(name):
+    # Блоком владеет GUI-процесс; воркер (spawn) делит с ним resource_tracker,
+    # поэтому повторная регистрация до 3.13 безвредна
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def run_producer(algorithm_name, initial, ring_name, slots, results, publish_interval, max_rate):
+    from algorithms import SortAlgorithms
+    from events import WRITE
+
+    ring = SnapshotRing(len(initial), slots, name=ring_name)
+    arr = list(initial)
+    algorithm = SortAlgorithms(algorithm_name)
+    changes = 0
+    started = last_publish = time.perf_counter()
+    # Генератор сортирует arr на месте, поэтому публикуется сам arr
+    for op, _, _ in algorithm.get_generator(arr):
+        if op > WRITE:
+            continue
+        changes += 1
+        # С ограничением темпа время проверяется на каждом изменении, иначе на малых
+        # n воркер шёл бы рывками по 64 изменения
+        if max_rate or changes & 63 == 0:
+            now = time.perf_counter()
+            if max_rate:
+                ahead = changes / max_rate - (now - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+                    now = time.perf_counter()
+            if now - last_publish >= publish_interval:
+                ring.publish(arr, changes)
+                last_publish = now
+    ring.publish(arr, changes, done=True)
+    results.put(algorithm.final_message)
+    ring.close()
+
+
+class ProcessProducer:
+    def __init__(self, algorithm_name, initial, slots=3, publish_interval=1 / 120, max_rate=None):
+        # max_rate - ограничение изменений в секунду; None - полная скорость
+        self.algorithm_name = algorithm_name
+        self.n = len(initial)
+        self.ring = SnapshotRing(self.n, slots)
+        # spawn: форк процесса с уже запущенным Qt небезопасен
+        ctx = multiprocessing.get_context("spawn")
+        self.results = ctx.Queue()
+        self.process = ctx.Process(
+            target=run_producer,
+            args=(algorithm_name, list(initial), self.ring.name, slots, self.results,
+                  publish_interval, max_rate),
+            daemon=True,
+        )
+        self.shown = np.array(initial, dtype=np.float64)
+        self.latest = np.empty(self.n, dtype=np.float64)
+        self.changes = 0
+        self.done = False
+        self.final_message = ""
+
+    def start(self):
+        self.process.start()
+
+    def poll(self, frame):
+        # Переносит в frame последний снимок воркера и возвращает изменённые индексы.
+        # None - воркер закончил и все его изменения уже показаны.
+        if self.done:
+            return None
+        snapshot = self.ring.read(self.latest)
+        if snapshot is None:
+            return np.empty(0, dtype=np.intp)
+        self.changes, finished = snapshot
+        dirty = np.flatnonzero(self.latest != self.shown)
+        self.shown[dirty] = self.latest[dirty]
+        frame[dirty] = self.latest[dirty]
+        if finished:
+            self.done = True
+            self.final_message = self.results.get()
+            if len(dirty) == 0:
+                return None
+        return dirty
+
+    def close(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.ring.close()
+        self.ring.unlink()
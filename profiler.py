@@ -0,0 +1,136 @@
+# Профиль кадров визуализатора для офлайн-разбора: Chrome trace (chrome://tracing,
+# Perfetto) или speedscope. Кадр (update_animation), его фазы (генератор, столбцы,
+# цвета) и отрисовка холста записываются вложенными отрезками с метками
+# perf_counter_ns; с памятью у каждого отрезка ещё прирост по tracemalloc
+# (в Chrome trace - аргумент отрезка и счётчик memory).
+#
+# Включается переменной окружения VISUALSORT_PROFILE=путь: *.speedscope.json -
+# формат speedscope, иначе Chrome trace; VISUALSORT_PROFILE_MEMORY=1 - с tracemalloc.
+# Без переменной визуализаторы получают NULL_PROFILER: span отдаёт один и тот же
+# пустой контекст, и цена отрезка - вызов метода.
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+OPEN, CLOSE = "B", "E"
+
+
+class NullProfiler:
+    enabled = False
+
+    def __init__(self):
+        self.empty = nullcontext()
+
+    def span(self, name):
+        return self.empty
+
+    def wrap(self, name, func):
+        return func
+
+    def instrument_canvas(self, canvas):
+        pass
+
+    def dump(self, path=None):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class FrameProfiler:
+    enabled = True
+
+    def __init__(self, name="visualsort", path=None, memory=False):
+        self.name = name
+        self.path = path
+        self.memory = memory  # прирост памяти по tracemalloc - заметно замедляет кадры
+        self.events = []  # (OPEN или CLOSE, имя, наносекунды, байты)
+        self.origin = time.perf_counter_ns()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def traced(self):
+        return tracemalloc.get_traced_memory()[0] if self.memory else 0
+
+    @contextmanager
+    def span(self, name):
+        self.events.append((OPEN, name, time.perf_counter_ns(), self.traced()))
+        try:
+            yield
+        finally:
+            self.events.append((CLOSE, name, time.perf_counter_ns(), self.traced()))
+
+    def wrap(self, name, func):
+        def wrapper(*args, **kwargs):
+            with self.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def instrument_canvas(self, canvas):
+        # Полная отрисовка и блиттинг идут вне update_animation - оборачиваем сам холст
+        canvas.draw = self.wrap("draw", canvas.draw)
+        canvas.blit = self.wrap("blit", canvas.blit)
+
+    # ---------- Форматы ----------
+    def chrome_trace(self, records):
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.name}}]
+        opened = []
+        for phase, name, ns, traced in records:
+            event = {"name": name, "ph": phase, "ts": (ns - self.origin) / 1000, "pid": pid, "tid": 0}
+            if phase == OPEN:
+                opened.append(traced)
+            elif self.memory:
+                # Аргументы события E дописываются к отрезку
+                event["args"] = {"alloc_bytes": traced - opened.pop()}
+            events.append(event)
+            if self.memory and phase == CLOSE:
+                events.append({"name": "memory", "ph": "C", "ts": event["ts"], "pid": pid, "tid": 0,
+                               "args": {"traced_bytes": traced}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def speedscope(self, records):
+        frames = {}
+        events = []
+        for phase, name, ns, _ in records:
+            index = frames.setdefault(name, len(frames))
+            events.append({"type": "O" if phase == OPEN else "C", "frame": index, "at": (ns - self.origin) / 1000})
+        end = events[-1]["at"] if events else 0
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": name} for name in frames]},
+            "profiles": [{"type": "evented", "name": self.name, "unit": "microseconds",
+                          "startValue": 0, "endValue": end, "events": events}],
+            "name": self.name,
+            "exporter": "visualsort",
+        }
+
+    def close_open(self):
+        # Окно закрыто посреди кадра - незакрытые отрезки завершаются сейчас
+        depth = []
+        for phase, name, _, _ in self.events:
+            if phase == OPEN:
+                depth.append(name)
+            else:
+                depth.pop()
+        now = time.perf_counter_ns()
+        return [(CLOSE, name, now, self.traced()) for name in reversed(depth)]
+
+    def dump(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        events = self.events + self.close_open()
+        data = self.speedscope(events) if path.endswith(".speedscope.json") else self.chrome_trace(events)
+        with open(path, "w") as f:
+            json.dump(data, f)
+        print(f"Профиль кадров: {path} ({sum(1 for e in self.events if e[0] == OPEN)} отрезков)")
+
+
+def make_profiler(name):
+    path = os.environ.get("VISUALSORT_PROFILE")
+    if not path:
+        return NULL_PROFILER
+    return FrameProfiler(name, path, memory=os.environ.get("VISUALSORT_PROFILE_MEMORY", "") not in ("", "0"))
@@ -0,0 +1,284 @@
+# Локальный сервер трансляции прогона в браузер: только стандартная библиотека.
+# Один поток-производитель сортирует массив (генератор из реестра, с кэшем трасс)
+# в темпе FramePacer и публикует изменённые индексы. Каждый зритель - отдельное
+# SSE-соединение (Server-Sent Events) со своей маской изменённых индексов:
+# пока медленный клиент отправляет кадр, новые изменения сливаются в его маску,
+# и следующий кадр несёт только последние значения. Производитель никого не ждёт,
+# а сколько бы ни было зрителей, сортировка идёт один раз.
+#
+# Кадр - двоичная дельта в base64: uint32 шаг, uint32 count, count индексов
+# uint32 и count значений float64 (little-endian). Первый кадр зрителя - массив
+# целиком, так что подключиться можно в любой момент.
+import argparse
+import base64
+import json
+import socket
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from algorithms import SortAlgorithms, algorithm_names, check_size, get_algorithm
+from distributions import make_input, value_limits
+from events import advance
+from pacing import FramePacer, estimate_changes
+from tracecache import cached_events
+
+# Комментарий SSE раз в KEEPALIVE секунд не даёт прокси закрыть тихое соединение
+KEEPALIVE = 15.0
+FRAME_HEADER = struct.Struct("<II")
+# Небольшой буфер отправки: медленный клиент быстрее упирается в запись,
+# и его изменения сливаются в маске, а не копятся в ядре
+SEND_BUFFER = 256 * 1024
+
+
+class Subscriber:
+    def __init__(self, n):
+        self.dirty = np.ones(n, dtype=bool)  # первый кадр - массив целиком
+        self.pending = True
+        self.sent_done = False
+
+
+class Broadcaster:
+    def __init__(self, algorithm_name, n, distribution="random", seed=0, fps=30, duration=20.0):
+        check_size(algorithm_name, n)
+        self.algorithm_name = algorithm_name
+        self.n = n
+        self.run = SortAlgorithms(algorithm_name)
+        arr = make_input(distribution, n, seed)
+        self.limits = value_limits(arr)
+        self.generator = cached_events(self.run, arr, seed, distribution)
+        self.pacer = FramePacer(estimate_changes(algorithm_name, n), fps=fps, duration=duration)
+        self.work = np.array(arr, dtype=float)  # буфер производителя
+        self.shared = self.work.copy()  # то, что видят клиенты; меняется под self.lock
+        self.step = 0
+        self.done = False
+        self.final_message = ""
+        self.subscribers = set()
+        self.lock = threading.Condition()
+
+    def meta(self):
+        return {"algorithm": self.algorithm_name, "title": get_algorithm(self.algorithm_name).title,
+                "n": self.n, "limits": list(self.limits)}
+
+    # ---------- Производитель ----------
+    def produce(self):
+        # Сортировка начинается с первым зрителем, чтобы он увидел прогон с начала
+        with self.lock:
+            self.lock.wait_for(lambda: self.subscribers)
+        frame_time = 1.0 / self.pacer.fps
+        while True:
+            started = time.perf_counter()
+            dirty = set()
+            changes = advance(self.generator, self.work, self.pacer.next_batch(), dirty)
+            if not changes:
+                break
+            self.pacer.done(changes)
+            self.publish(np.fromiter(dirty, dtype=np.intp, count=len(dirty)), changes)
+            time.sleep(max(0.0, frame_time - (time.perf_counter() - started)))
+        with self.lock:
+            self.done = True
+            self.final_message = self.run.final_message
+            self.lock.notify_all()
+
+    def publish(self, indices, changes):
+        with self.lock:
+            self.shared[indices] = self.work[indices]
+            self.step += changes
+            for subscriber in self.subscribers:
+                subscriber.dirty[indices] = True
+                subscriber.pending = True
+            self.lock.notify_all()
+
+    def start(self):
+        thread = threading.Thread(target=self.produce, name="producer", daemon=True)
+        thread.start()
+        return thread
+
+    # ---------- Клиенты ----------
+    def subscribe(self):
+        subscriber = Subscriber(self.n)
+        with self.lock:
+            self.subscribers.add(subscriber)
+            self.lock.notify_all()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def next_message(self, subscriber, timeout=KEEPALIVE):
+        # Следующее SSE-сообщение клиента: накопленная дельта, конец прогона или ping
+        with self.lock:
+            self.lock.wait_for(lambda: subscriber.pending or (self.done and not subscriber.sent_done), timeout)
+            if subscriber.pending:
+                indices = np.flatnonzero(subscriber.dirty)
+                values = self.shared[indices]
+                subscriber.dirty[indices] = False
+                subscriber.pending = False
+                step = self.step
+            elif self.done and not subscriber.sent_done:
+                subscriber.sent_done = True
+                return sse("done", json.dumps({"message": self.final_message, "step": self.step},
+                                              ensure_ascii=False))
+            else:
+                return b": ping\n\n"
+        payload = FRAME_HEADER.pack(step, len(indices)) + indices.astype("<u4").tobytes() + \
+            values.astype("<f8").tobytes()
+        return sse("frame", base64.b64encode(payload).decode("ascii"))
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+# ---------- HTTP ----------
+class StreamHandler(BaseHTTPRequestHandler):
+    broadcaster = None  # задаётся в serve()
+
+    def do_GET(self):
+        if self.path == "/":
+            body = CLIENT_HTML.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == "/events":
+            self.stream_events()
+        else:
+            self.send_error(404)
+
+    def stream_events(self):
+        broadcaster = self.broadcaster
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        subscriber = broadcaster.subscribe()
+        try:
+            self.wfile.write(sse("meta", json.dumps(broadcaster.meta(), ensure_ascii=False)))
+            while not subscriber.sent_done:
+                # Пока идёт запись в сокет, изменения копятся в маске клиента
+                self.wfile.write(broadcaster.next_message(subscriber))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(broadcaster, host="127.0.0.1", port=8000):
+    handler = type("Handler", (StreamHandler,), {"broadcaster": broadcaster})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+CLIENT_HTML = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<title>Сортировка</title>
+<style>
+  body { margin: 0; background: #111; color: #ddd; font: 14px sans-serif; }
+  #status { padding: 6px 10px; }
+  canvas { display: block; width: 100vw; height: calc(100vh - 32px); }
+</style>
+</head>
+<body>
+<div id="status">Подключение...</div>
+<canvas id="view"></canvas>
+<script>
+const status = document.getElementById("status");
+const canvas = document.getElementById("view");
+const ctx = canvas.getContext("2d");
+const source = new EventSource("/events");
+let meta = null, values = null, columns = 0, levels = null, dirtyColumns = new Set(), scheduled = false;
+
+// Колонка c - элементы [start(c), start(c + 1)); высота колонки - максимум
+function start(c) { return Math.floor(c * meta.n / columns); }
+function color(value) {
+  const t = (value - meta.limits[0]) / (meta.limits[1] - meta.limits[0]);
+  return `hsl(${260 - 200 * t}, 70%, 55%)`;
+}
+function drawColumn(c) {
+  let top = -Infinity;
+  for (let i = start(c); i < start(c + 1); i++) top = Math.max(top, values[i]);
+  const [low, high] = meta.limits;
+  const h = Math.round((top - low) / (high - low) * canvas.height);
+  ctx.clearRect(c, 0, 1, canvas.height);
+  ctx.fillStyle = color(top);
+  ctx.fillRect(c, canvas.height - h, 1, h);
+}
+function redraw() {
+  scheduled = false;
+  for (const c of dirtyColumns) drawColumn(c);
+  dirtyColumns.clear();
+}
+
+source.addEventListener("meta", (event) => {
+  meta = JSON.parse(event.data);
+  values = new Float64Array(meta.n);
+  columns = Math.max(1, Math.min(meta.n, canvas.clientWidth));
+  canvas.width = columns;
+  canvas.height = canvas.clientHeight;
+  status.textContent = `${meta.algorithm} > ${meta.title}, n = ${meta.n}`;
+});
+source.addEventListener("frame", (event) => {
+  const raw = Uint8Array.from(atob(event.data), (ch) => ch.charCodeAt(0));
+  const view = new DataView(raw.buffer);
+  const step = view.getUint32(0, true), count = view.getUint32(4, true);
+  for (let k = 0; k < count; k++) {
+    const i = view.getUint32(8 + 4 * k, true);
+    values[i] = view.getFloat64(8 + 4 * count + 8 * k, true);
+    dirtyColumns.add(Math.floor(i * columns / meta.n));
+  }
+  status.textContent = `${meta.algorithm} > ${meta.title}, n = ${meta.n} | шаг ${step}`;
+  if (!scheduled) { scheduled = true; requestAnimationFrame(redraw); }
+});
+source.addEventListener("done", (event) => {
+  const done = JSON.parse(event.data);
+  status.textContent = `${meta.algorithm} > ${meta.title}, n = ${meta.n} | ${done.message}`;
+  source.close();
+});
+</script>
+</body>
+</html>
+"""
+
+
+# ---------- Консольный интерфейс ----------
+def main():
+    parser = argparse.ArgumentParser(description="Трансляция сортировки в браузер (SSE)")
+    parser.add_argument("algorithm", help=", ".join(algorithm_names()))
+    parser.add_argument("size", type=int)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--distribution", default="random", help="форма входа, см. distributions.py")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--duration", type=float, default=20.0, help="целевая длительность, сек")
+    args = parser.parse_args()
+
+    broadcaster = Broadcaster(args.algorithm, args.size, args.distribution, args.seed,
+                              fps=args.fps, duration=args.duration)
+    server = serve(broadcaster, args.host, args.port)
+    broadcaster.start()
+    print(f"{args.algorithm}: http://{args.host}:{args.port}/ (Ctrl+C - остановить)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Рендерер столбцов в терминале (ANSI) для удалённых машин без X, в том числе по SSH.
+# Столбцы рисуются блочными символами Unicode с разрешением 1/8 клетки.
+# Если n больше ширины терминала, соседние элементы сводятся в одну колонку
+# (высота колонки - максимум её элементов). Рендерер помнит высоты колонок
+# и на каждом кадре переписывает только клетки колонок, чья высота изменилась,
+# одной записью в поток - трафик зависит от числа изменений, а не от n.
+import shutil
+import sys
+
+import numpy as np
+
+# Частичные блоки снизу вверх: 0/8 .. 8/8 клетки
+BLOCKS = " ▁▂▃▄▅▆▇█"
+
+ENTER = "\x1b[?1049h\x1b[?25l\x1b[2J"  # альтернативный экран, скрыть курсор, очистить
+LEAVE = "\x1b[0m\x1b[?25h\x1b[?1049l"
+# Во сколько раз проще пересчитать все колонки, чем каждую изменённую по отдельности
+FULL_REBIN = 4
+
+
+class TerminalRenderer:
+    def __init__(self, heights, limits, width=None, height=None, stream=None):
+        self.stream = stream or sys.stdout
+        size = shutil.get_terminal_size()
+        self.n = len(heights)
+        self.low, self.high = limits
+        self.width = max(1, width or size.columns)  # ширина терминала - для строки статуса
+        self.columns = max(1, min(self.n, self.width))
+        # Последняя строка - статус
+        self.rows = max(1, (height or size.lines) - 1)
+        # Границы колонок: колонка c - элементы [starts[c], starts[c + 1])
+        self.starts = np.arange(self.columns + 1) * self.n // self.columns
+        self.levels = np.zeros(self.columns, dtype=np.int64)
+        self.status = ""
+        self.stream.write(ENTER)
+        self.redraw(heights)
+
+    def column_levels(self, heights, columns=None):
+        # Высота колонок в восьмых долях клетки; columns=None - все колонки
+        values = np.asarray(heights, dtype=float)
+        if columns is None:
+            binned = np.maximum.reduceat(values, self.starts[:-1]) if self.n else np.zeros(0)
+        else:
+            binned = np.array([values[self.starts[c]:self.starts[c + 1]].max() for c in columns])
+        span = (self.high - self.low) or 1
+        scaled = np.rint((binned - self.low) / span * self.rows * 8)
+        return np.clip(scaled, 0, self.rows * 8).astype(np.int64)
+
+    def redraw(self, heights):
+        # Полная перерисовка: все клетки всех колонок
+        self.levels = self.column_levels(heights)
+        parts = ["\x1b[H"]
+        for row in range(self.rows):
+            parts.append("".join(self.cells(self.levels, self.rows - 1 - row)))
+            parts.append("\r\n")
+        parts.append(self.status_line())
+        self.stream.write("".join(parts))
+        self.stream.flush()
+
+    def cells(self, levels, row):
+        # Символы строки row (0 - нижняя) для колонок с уровнями levels
+        fill = np.clip(levels - row * 8, 0, 8)
+        return [BLOCKS[k] for k in fill.tolist()]
+
+    def update(self, dirty, heights, status=None):
+        # dirty - изменённые индексы (множество или массив), heights - буфер целиком
+        if status is not None:
+            self.status = status
+        dirty = np.fromiter(dirty, dtype=np.intp, count=len(dirty)) if isinstance(dirty, set) else dirty
+        parts = []
+        if len(dirty):
+            columns = np.unique(np.searchsorted(self.starts, dirty, side="right") - 1)
+            if len(columns) * FULL_REBIN > self.columns:
+                levels = self.column_levels(heights)
+                columns = np.flatnonzero(levels != self.levels)
+                new = levels[columns]
+            else:
+                new = self.column_levels(heights, columns.tolist())
+                changed = new != self.levels[columns]
+                columns, new = columns[changed], new[changed]
+            for c, old, level in zip(columns.tolist(), self.levels[columns].tolist(), new.tolist()):
+                # Переписываются только строки между старой и новой вершиной
+                for row in range(min(old, level) // 8, min(max(old, level) // 8, self.rows - 1) + 1):
+                    fill = min(max(level - row * 8, 0), 8)
+                    parts.append(f"\x1b[{self.rows - row};{c + 1}H{BLOCKS[fill]}")
+            self.levels[columns] = new
+        parts.append(self.status_line())
+        self.stream.write("".join(parts))
+        self.stream.flush()
+
+    def status_line(self):
+        return f"\x1b[{self.rows + 1};1H\x1b[2K{self.status[:self.width]}"
+
+    def close(self):
+        self.stream.write(LEAVE)
+        self.stream.flush()
@@ -0,0 +1,142 @@
+# Дисковый кэш трасс сортировки. Одинаковые демо (алгоритм, вариант, n,
+# seed, распределение входа) дают одинаковые трассы, поэтому повторный запуск
+# читает записанную трассу вместо повторной сортировки. Ключ включает хэш
+# исходников алгоритмов, событий и генераторов входа - после правки кода
+# старые трассы просто не находятся. Размер кэша ограничен, при переполнении
+# удаляются давно не использованные трассы (LRU по времени изменения файла).
+#
+# Каталог - VISUALSORT_CACHE (по умолчанию ~/.cache/visualsort), предел -
+# VISUALSORT_CACHE_MB (по умолчанию 1024). VISUALSORT_CACHE=off отключает кэш.
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+from tracefile import MAGIC, Trace, TraceWriter
+
+DEFAULT_MAX_MB = 1024
+
+# Файлы, от которых зависит содержимое трассы
+SOURCES = ["events.py", "distributions.py", "tracefile.py", os.path.join("algorithms", "*.py")]
+
+code_hash = None
+
+
+def code_version():
+    global code_hash
+    if code_hash is None:
+        root = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha1(MAGIC)
+        for pattern in SOURCES:
+            for path in sorted(glob.glob(os.path.join(root, pattern))):
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+        code_hash = digest.hexdigest()[:12]
+    return code_hash
+
+
+class TraceCache:
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or os.environ.get("VISUALSORT_CACHE") or \
+            os.path.join(os.path.expanduser("~"), ".cache", "visualsort")
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("VISUALSORT_CACHE_MB", DEFAULT_MAX_MB)) * 2 ** 20)
+        self.max_bytes = max_bytes
+
+    def key(self, algorithm_name, n, seed, distribution):
+        from algorithms import get_algorithm
+        spec = get_algorithm(algorithm_name)
+        # Число ядер - в ключе: параллельные алгоритмы делят работу по воркерам
+        return {"algorithm": algorithm_name, "variant": spec.options, "n": n, "seed": seed,
+                "distribution": distribution, "cpus": os.cpu_count(), "code": code_version()}
+
+    def path_for(self, key):
+        name = hashlib.sha1(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.directory, f"{name}.vst")
+
+    def lookup(self, key):
+        # Trace из кэша или None; найденная трасса становится самой свежей для LRU
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            trace = Trace(path)
+        except (ValueError, OSError):
+            os.remove(path)
+            return None
+        os.utime(path)
+        return trace
+
+    def record(self, key, generator, initial, run):
+        # Пропускает события generator дальше и параллельно пишет трассу.
+        # В кэш она попадает, только если сортировка дошла до конца.
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key)
+        fd, partial = tempfile.mkstemp(suffix=".part", dir=self.directory)
+        os.close(fd)
+        writer = TraceWriter(partial, initial, metadata=key)
+        complete = False
+        try:
+            for event in generator:
+                writer.append(event)
+                yield event
+            complete = True
+        finally:
+            writer.close(final_message=run.final_message)
+            if complete:
+                os.replace(partial, path)
+                self.evict()
+            else:
+                os.remove(partial)
+
+    def evict(self):
+        # Удаляет самые старые трассы, пока кэш не уложится в max_bytes
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, "*.vst")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        for path in glob.glob(os.path.join(self.directory, "*.vst")):
+            os.remove(path)
+
+
+def cache_enabled():
+    return os.environ.get("VISUALSORT_CACHE", "").lower() not in ("off", "0", "no")
+
+
+def find_cached(algorithm_name, n, seed, distribution, cache=None):
+    # Записанная трасса такого прогона (Trace) или None
+    if seed is None or not cache_enabled():
+        return None
+    cache = cache or TraceCache()
+    return cache.lookup(cache.key(algorithm_name, n, seed, distribution))
+
+
+def cached_events(run, arr, seed, distribution, cache=None):
+    # События сортировки arr алгоритмом run (SortAlgorithms): из кэша, если такой
+    # прогон уже записан, иначе живой генератор, который записывает трассу.
+    # Без seed вход случайный и не кэшируется.
+    if seed is None or not cache_enabled():
+        return run.get_generator(arr.copy())
+    cache = cache or TraceCache()
+    key = cache.key(run.algorithm_name, len(arr), seed, distribution)
+    trace = cache.lookup(key)
+    if trace is not None:
+        return replay_events(trace, run)
+    return cache.record(key, run.get_generator(arr.copy()), arr, run)
+
+
+def replay_events(trace, run):
+    yield from trace.events()
+    run.final_message = trace.metadata.get("final_message", "")
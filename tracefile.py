@@ -0,0 +1,216 @@
+# Запись прогона сортировки в бинарный файл трассы и воспроизведение с перемоткой.
+#
+# Формат: заголовок HEADER_SIZE байт (магическая строка + JSON с метаданными),
+# затем блоки одинакового размера. Блок = ключевой кадр (состояние массива
+# перед первым событием блока) + keyframe_interval событий фиксированной ширины.
+# Файл открывается через numpy.memmap, переход к любому шагу стоит
+# O(keyframe_interval) и не требует держать всю историю в памяти.
+import argparse
+import json
+
+import numpy as np
+
+from events import WRITE, apply_event
+from replay import apply_block, diff_state
+
+MAGIC = b"VSTRACE1"
+HEADER_SIZE = 4096
+EVENT_DTYPE = np.dtype([("op", "u1"), ("a", "<i4"), ("b", "<f8")])
+
+
+def block_dtype(n, keyframe_interval):
+    return np.dtype([
+        ("keyframe", "<f8", (n,)),
+        ("events", EVENT_DTYPE, (keyframe_interval,)),
+    ])
+
+
+def default_keyframe_interval(n):
+    # Ключевые кадры занимают не больше места, чем сами события
+    return max(4096, n)
+
+
+class TraceWriter:
+    def __init__(self, path, initial, keyframe_interval=None, metadata=None):
+        self.n = len(initial)
+        self.keyframe_interval = keyframe_interval or default_keyframe_interval(self.n)
+        self.metadata = dict(metadata or {})
+        self.state = list(initial)
+        self.pending = []
+        self.event_count = 0
+        self.block_count = 0
+        self.block = np.zeros(1, dtype=block_dtype(self.n, self.keyframe_interval))
+        self.block["keyframe"][0] = self.state
+        self.file = open(path, "wb")
+        self.file.write(b"\0" * HEADER_SIZE)
+
+    def append(self, event):
+        self.pending.append(event)
+        apply_event(self.state, event)
+        self.event_count += 1
+        if len(self.pending) == self.keyframe_interval:
+            self.flush_block()
+            self.block["keyframe"][0] = self.state
+
+    def flush_block(self):
+        events = self.block["events"][0]
+        events[:] = 0
+        if self.pending:
+            events[:len(self.pending)] = np.array(self.pending, dtype=EVENT_DTYPE)
+        self.block.tofile(self.file)
+        self.block_count += 1
+        self.pending = []
+
+    def close(self, **metadata):
+        if self.pending or self.block_count == 0:
+            self.flush_block()
+        self.metadata.update(metadata)
+        header = dict(self.metadata, n=self.n, keyframe_interval=self.keyframe_interval,
+                      event_count=self.event_count, block_count=self.block_count)
+        payload = MAGIC + json.dumps(header, ensure_ascii=False).encode("utf-8")
+        if len(payload) > HEADER_SIZE:
+            raise ValueError("Слишком большие метаданные трассы")
+        self.file.seek(0)
+        self.file.write(payload.ljust(HEADER_SIZE, b"\0"))
+        self.file.close()
+
+
+def record_trace(path, generator, initial, keyframe_interval=None, metadata=None):
+    writer = TraceWriter(path, initial, keyframe_interval, metadata)
+    for event in generator:
+        writer.append(event)
+    writer.close()
+    return writer.event_count
+
+
+class Trace:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            raw = f.read(HEADER_SIZE)
+        if not raw.startswith(MAGIC):
+            raise ValueError(f"{path}: не файл трассы")
+        self.metadata = json.loads(raw[len(MAGIC):].rstrip(b"\0").decode("utf-8"))
+        self.n = self.metadata["n"]
+        self.keyframe_interval = self.metadata["keyframe_interval"]
+        self.event_count = self.metadata["event_count"]
+        self.blocks = np.memmap(path, dtype=block_dtype(self.n, self.keyframe_interval), mode="r",
+                                offset=HEADER_SIZE, shape=(self.metadata["block_count"],))
+
+    def __len__(self):
+        return self.event_count
+
+    def block_of(self, step):
+        return min(step // self.keyframe_interval, len(self.blocks) - 1)
+
+    def state_array(self, step):
+        # Состояние массива после первых step событий: ключевой кадр + остаток блока
+        step = max(0, min(step, self.event_count))
+        block = self.block_of(step)
+        state = np.array(self.blocks[block]["keyframe"])
+        records = self.records(block * self.keyframe_interval, step)
+        apply_block(state, records["op"], records["a"], records["b"])
+        return state
+
+    def state_at(self, step):
+        return self.state_array(step).tolist()
+
+    def replay(self, buf, start, stop):
+        # Переводит buf (np.ndarray) из состояния после start событий в состояние
+        # после stop. Возвращает (dirty, heights). Если между ними есть ключевой
+        # кадр (или это перемотка назад), состояние берётся от ключевого кадра
+        # и сравнивается с buf - цена не зависит от длины перемотки.
+        stop = max(0, min(stop, self.event_count))
+        if stop < start or self.block_of(stop) != self.block_of(start):
+            return diff_state(buf, self.state_array(stop))
+        records = self.records(start, stop)
+        return apply_block(buf, records["op"], records["a"], records["b"])
+
+    def records(self, start, stop):
+        # Срез событий [start, stop) как структурный массив
+        stop = min(stop, self.event_count)
+        parts = []
+        while start < stop:
+            block = start // self.keyframe_interval
+            offset = start - block * self.keyframe_interval
+            count = min(stop - start, self.keyframe_interval - offset)
+            parts.append(self.blocks[block]["events"][offset:offset + count])
+            start += count
+        if not parts:
+            return np.zeros(0, dtype=EVENT_DTYPE)
+        return np.concatenate(parts)
+
+    def change_steps(self):
+        # Номера шагов (1..len), на которых массив менялся (swap/write)
+        parts = []
+        for block in range(len(self.blocks)):
+            begin = block * self.keyframe_interval
+            count = min(self.keyframe_interval, self.event_count - begin)
+            ops = self.blocks[block]["events"]["op"][:count]
+            parts.append(np.flatnonzero(ops <= WRITE) + begin + 1)
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.intp)
+
+    def events(self, start=0, stop=None):
+        # События как кортежи (op, a, b), совместимые с генераторами сортировки
+        stop = self.event_count if stop is None else stop
+        chunk = self.keyframe_interval
+        for begin in range(start, min(stop, self.event_count), chunk):
+            for op, a, b in self.records(begin, min(begin + chunk, stop)).tolist():
+                yield (op, a, int(b) if b.is_integer() else b)
+
+
+# ---------- Консольный интерфейс ----------
+def main():
+    parser = argparse.ArgumentParser(description="Запись и воспроизведение трасс сортировки")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="прогнать сортировку и записать трассу")
+    record.add_argument("algorithm")
+    record.add_argument("size", type=int)
+    record.add_argument("output")
+    record.add_argument("--seed", type=int)
+    record.add_argument("--distribution", default="random", help="форма входа, см. distributions.py")
+    record.add_argument("--keyframe-interval", type=int)
+    play = commands.add_parser("play", help="открыть трассу в визуализаторе")
+    play.add_argument("path")
+    play.add_argument("--3d", dest="is_3d", action="store_true")
+    play.add_argument("--terminal", action="store_true", help="рисовать в терминале (без X, по SSH)")
+    play.add_argument("--update-every", type=int, help="изменений на кадр; по умолчанию подбирается автоматически")
+    play.add_argument("--fps", type=int, default=60)
+    play.add_argument("--duration", type=float, default=20.0, help="целевая длительность, сек")
+    export = commands.add_parser("export", help="отрендерить трассу в видео/GIF/PNG параллельно")
+    export.add_argument("path")
+    export.add_argument("output")
+    export.add_argument("--workers", type=int, help="число процессов; по умолчанию - все ядра")
+    export.add_argument("--fps", type=int, default=30)
+    export.add_argument("--update-every", type=int, default=10, help="изменений массива на кадр")
+    export.add_argument("--width", type=int)
+    export.add_argument("--height", type=int)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        from algorithms import SortAlgorithms
+        from distributions import make_input
+        arr = make_input(args.distribution, args.size, args.seed)
+        algorithm = SortAlgorithms(args.algorithm)
+        writer = TraceWriter(args.output, arr, args.keyframe_interval,
+                             {"algorithm": args.algorithm, "seed": args.seed,
+                              "distribution": args.distribution})
+        for event in algorithm.get_generator(arr.copy()):
+            writer.append(event)
+        writer.close(final_message=algorithm.final_message)
+        print(f"{args.algorithm}: {algorithm.final_message}, событий: {writer.event_count} -> {args.output}")
+    elif args.command == "export":
+        from export import export_trace
+        frames = export_trace(args.path, args.output, fps=args.fps, update_every=args.update_every,
+                              width=args.width, height=args.height, workers=args.workers)
+        print(f"{args.path}: кадров: {frames} -> {args.output}")
+    else:
+        from more_algoritms import SortingVisualizer
+        trace = Trace(args.path)
+        visualizer = SortingVisualizer(trace.metadata.get("algorithm", "trace"), trace.n,
+                                       is_3d=args.is_3d, update_every=args.update_every, trace=trace,
+                                       fps=args.fps, duration=args.duration, terminal=args.terminal)
+        visualizer.visualize()
+
+
+if __name__ == "__main__":
+    main()